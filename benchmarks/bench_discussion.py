@@ -0,0 +1,129 @@
+"""
+Benchmark for Discussion.entries_from_view(), using a synthetic discussion view.
+
+Two threads are generated, each with 2000 entries written by 400 participants:
+    tree: 200 top-level entries, and every other entry replies to a random earlier entry
+    chain: every entry replies to the one before it (a single 2000-deep reply chain)
+
+The baseline is the original get_entries() (recursive flattening of the replies, and a scan of the whole
+participant list for the author of each entry). It is compared against the current entries_from_view(). The
+baseline reaches the recursion limit on the chain.
+
+Usage (from the root of the repository):
+    python benchmarks/bench_discussion.py [entries] [participants]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from canvas_access.canvas_object import CanvasObject
+from canvas_access.discussion import Discussion
+from canvas_access.entry import Entry
+from canvas_access.util import list_to_dict
+
+def make_view(entries: int = 2000, participants: int = 400, chain: bool = False, seed: int = 1) -> dict:
+    """
+    Generates the json dictionary of a discussion view.
+
+    Args:
+        entries (int): The number of entries.
+        participants (int): The number of participants. Each entry is written by a random participant.
+        chain (bool): If True, every entry replies to the one before it. Otherwise the first 10% of the entries are
+            top-level and every other entry replies to a random earlier entry.
+        seed (int): The seed of the random authors and parents, so every run builds the same view.
+
+    Returns:
+        dict: The view, with participants and the nested view.
+    """
+    rng = random.Random(seed)
+    entry_dicts = {}
+    view = []
+    for entry_id in range(1, entries + 1):
+        if chain:
+            parent_id = entry_id - 1 if entry_id > 1 else None
+        else:
+            parent_id = None if entry_id <= entries // 10 else rng.randint(1, entry_id - 1)
+        entry = {
+            'id': entry_id,
+            'user_id': rng.randint(1, participants),
+            'parent_id': parent_id,
+            'message': f'<p>Reply {entry_id}</p>',
+            'created_at': '2024-01-01T00:00:00Z',
+            'updated_at': '2024-01-01T00:00:00Z'
+        }
+        entry_dicts[entry_id] = entry
+        if parent_id == None:
+            view.append(entry)
+        else:
+            entry_dicts[parent_id].setdefault('replies', []).append(entry)
+    return {
+        'participants': [{'id': user_id, 'display_name': f'Student {user_id}'} for user_id in range(1, participants + 1)],
+        'view': view
+    }
+
+def baseline_entries_from_view(discussion: Discussion, view: dict) -> dict[Entry]:
+    """The original get_entries() (after the API call)"""
+    def get_replies(entry):
+        """Recursively convert replies to entries"""
+        replies = []
+        if 'replies' in entry.keys():
+            for reply in entry['replies']:
+                replies.append(reply)
+                replies += get_replies(reply)
+        return replies
+
+    discussion.participants = view['participants']
+    initial_entries = view['view']
+    replies = []
+    for entry in initial_entries:
+        replies += get_replies(entry)
+    entry_list = initial_entries + replies
+
+    entry_dict = list_to_dict(discussion, Entry, entry_list)
+
+    for entry_id, entry in entry_dict.items():
+        if 'user_id' in entry.__dict__.keys():
+            entry.user_name = [participant['display_name']
+                                for participant in discussion.participants
+                                if participant['id'] == entry.user_id][0]
+        if entry.parent_id != None:
+            entry_dict[entry.parent_id].reply_list += [entry_id]
+    return entry_dict
+
+def best_time(function, repeat: int = 5) -> tuple[float, dict[Entry]]:
+    """Runs function repeat times and returns the best time (in ms) and the last result"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best == None else min(best, elapsed)
+    return best, result
+
+def main(entries: int = 2000, participants: int = 400) -> None:
+    """Times the baseline and the current entries_from_view() for the tree and the chain"""
+    course = CanvasObject({'id': 1, 'name': 'Benchmark Course'})
+    course.type = 'Course'
+    discussion = Discussion(course, {'id': 1, 'title': 'Benchmark Discussion'})
+
+    print(f'{entries} entries x {participants} participants, best of 5:')
+    for chain in [False, True]:
+        view = make_view(entries, participants, chain)
+        name = 'chain' if chain else 'tree'
+        current_time, current = best_time(lambda: discussion.entries_from_view(view))
+        try:
+            baseline_time, baseline = best_time(lambda: baseline_entries_from_view(discussion, view))
+        except RecursionError:
+            print(f'\t{name:<6}baseline RecursionError \tcurrent {current_time:.1f} ms')
+            continue
+        for entry_id, entry in baseline.items():
+            assert current[entry_id].user_name == entry.user_name
+            assert current[entry_id].reply_list == entry.reply_list
+        print(f'\t{name:<6}baseline {baseline_time:.1f} ms \tcurrent {current_time:.1f} ms')
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,109 @@
+"""
+Benchmark for the timestamp handling of CanvasObject.__init__, using a typical Submission from the API.
+
+The baseline is the original constructor: every value was tested with z_time_str_test() (a parse inside a bare
+except) and then parsed twice more, and the local time string was formatted twice for each time. It is
+compared against the current Submission, which parses each time once and only when a derived time attribute
+(_dt, _display, _localtime) is first used.
+
+Usage (from the root of the repository):
+    python benchmarks/bench_timestamps.py [number]
+
+    number (int): The number of objects built for each timing (default 20000). The best of 5 timings is shown.
+"""
+
+import os
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pytz import timezone
+from canvas_access.canvas_object import CanvasObject
+from canvas_access.submission import Submission
+from canvas_access.util import dt_to_local_str
+
+# A graded online upload, as sent by /courses/:course_id/students/submissions
+SUBMISSION = {
+    'id': 123456, 'body': None, 'url': None, 'grade': '8', 'score': 8.0, 'submitted_at': '2024-02-01T18:22:05Z',
+    'assignment_id': 4321, 'user_id': 9876, 'submission_type': 'online_upload', 'workflow_state': 'graded',
+    'grade_matches_current_submission': True, 'graded_at': '2024-02-03T02:10:44Z', 'grader_id': 555, 'attempt': 1,
+    'cached_due_date': '2024-02-02T07:59:59Z', 'excused': False, 'late_policy_status': None, 'points_deducted': None,
+    'grading_period_id': None, 'extra_attempts': None, 'posted_at': '2024-02-03T02:10:44Z', 'redo_request': False,
+    'custom_grade_status_id': None, 'sticker': None, 'late': False, 'missing': False, 'seconds_late': 0,
+    'entered_grade': '8', 'entered_score': 8.0,
+    'preview_url': 'https://campus.instructure.com/courses/1/assignments/4321/submissions/9876?preview=1&version=1',
+    'anonymous_id': 'AbC12'
+}
+TIME_KEYS = [key for key in SUBMISSION.keys() if key.endswith('_at') or key == 'cached_due_date']
+
+def baseline_z_time_str_test(test_str: str) -> bool:
+    """The original z_time_str_test()"""
+    try:
+        datetime.fromisoformat(test_str.replace('Z', '+00:00'))
+        return True
+    except:
+        return False
+
+def baseline_z_time_str_to_dt(z_time_str: str) -> datetime:
+    """The original z_time_str_to_dt()"""
+    return datetime.fromisoformat(z_time_str.replace('Z', '+00:00'))
+
+class BaselineSubmission(Submission):
+    """A Submission built by the original CanvasObject constructor"""
+
+    def __init__(self, parent: CanvasObject, json_dict: dict):
+        self.inherit(parent, ['course_id', 'course_name'])
+        self.course_id = parent.id
+        self.course_name = parent.name
+        self.id = None
+        self.type = 'CanvasObject'
+        for key, item in json_dict.items():
+            self.__dict__[key] = item
+            if baseline_z_time_str_test(item):
+                self.__dict__[key + '_dt'] = baseline_z_time_str_to_dt(item)
+                self.__dict__[key + '_display'] = baseline_z_time_str_to_dt(item)
+                if 'tz' in self.__dict__:
+                    if self.tz != None:
+                        self.__dict__[key + '_localtime'] = dt_to_local_str(self.__dict__[key + '_dt'], self.tz)
+                        self.__dict__[key + '_display'] = dt_to_local_str(self.__dict__[key + '_dt'], self.tz)
+        self.type = 'Submission'
+
+def build_current(parent: CanvasObject) -> Submission:
+    """Builds a Submission without using any derived time attributes"""
+    return Submission(parent, SUBMISSION)
+
+def build_current_and_read(parent: CanvasObject) -> Submission:
+    """Builds a Submission and uses every derived time attribute (the cost the baseline always paid)"""
+    submission = Submission(parent, SUBMISSION)
+    for key in TIME_KEYS:
+        getattr(submission, key + '_dt')
+        getattr(submission, key + '_display')
+    return submission
+
+def build_baseline(parent: CanvasObject) -> Submission:
+    """Builds a Submission with the original constructor"""
+    return BaselineSubmission(parent, SUBMISSION)
+
+def main(number: int = 20000) -> None:
+    """Times each way of building a Submission and prints the best time per object"""
+    course = CanvasObject({'id': 1, 'name': 'Benchmark Course'})
+    course.type = 'Course'
+    course.tz = timezone('America/Los_Angeles')
+
+    current = build_current_and_read(course)
+    baseline = build_baseline(course)
+    for key in TIME_KEYS:
+        assert getattr(current, key + '_dt') == getattr(baseline, key + '_dt')
+        assert getattr(current, key + '_display') == getattr(baseline, key + '_display')
+
+    print(f'Submission with {len(SUBMISSION)} fields ({len(TIME_KEYS)} times), best of 5 x {number}:')
+    results = {}
+    for name, build in [('baseline', build_baseline), ('current', build_current),
+                        ('current + all times used', build_current_and_read)]:
+        results[name] = min(timeit.repeat(lambda: build(course), number = number, repeat = 5)) / number * 1e6
+        print(f'\t{name:<26}{results[name]:6.1f} us/object \t{results["baseline"] / results[name]:4.1f}x')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
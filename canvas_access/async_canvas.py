@@ -0,0 +1,202 @@
+"""
+Module for the AsyncCanvas CanvasObject for the canvas_access module. This is an opt-in alternative to Canvas
+whose collection methods can be awaited, so that many API calls can be made at the same time.
+
+Requires the httpx package (and the h2 package for HTTP/2).
+"""
+
+import asyncio
+from canvas_access.assignment import Assignment
+from canvas_access.canvas import Canvas
+from canvas_access.canvas_object import CanvasObject
+from canvas_access.course import Course
+from canvas_access.discussion import Discussion
+from canvas_access.entry import Entry
+from canvas_access.session import AsyncCanvasSession
+from canvas_access.submission import Submission
+from canvas_access.user import User
+from canvas_access.util import GET_list_async, list_to_dict
+
+class AsyncCanvas(Canvas):
+    """
+    Base level login for canvas_access that can also make awaitable API calls. All of the blocking Canvas
+    methods are still available, and the CanvasObjects that are created are the same as the ones created
+    by Canvas.
+
+    Example:
+        async with AsyncCanvas(API_URL, API_KEY) as canvas:
+            courses = await canvas.get_courses_async()
+            assignments = await asyncio.gather(*[canvas.get_assignments_async(course) for course in courses.values()])
+
+    Attributes:
+        Canvas attributes: See Canvas
+        async_session (AsyncCanvasSession): Used for the awaitable API calls. It shares the RateLimiter and
+            RetryPolicy of the session.
+
+    Methods:
+        aclose(): Closes the async session
+        get_assignments_async(): Awaitable version of Course.get_assignments()
+        get_courses_async(): Awaitable version of Canvas.get_courses()
+        get_entries_async(): Awaitable version of Discussion.get_entries()
+        get_submissions_async(): Awaitable version of Assignment.get_submissions(), User.get_submissions(),
+            and Course.get_submissions()
+        get_users_async(): Awaitable version of Course.get_users()
+        set_retry_policy(): Sets how failed requests are repeated for both sessions
+    """
+
+    def __init__(self, canvas_url, key, http2: bool = True):
+        super().__init__(canvas_url, key)
+
+        import httpx
+        if http2:
+            try:
+                import h2
+            except ImportError:
+                http2 = False
+        self.async_session = AsyncCanvasSession(httpx.AsyncClient(http2 = http2, timeout = 60), self.rate_limiter, self.retry_policy)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Closes the async session"""
+        await self.async_session.aclose()
+
+    def set_retry_policy(self, max_retries: int = 5, backoff: float = 0.5, max_backoff: float = 60) -> None:
+        """Sets how failed requests are repeated for both the session and the async session. See Canvas.set_retry_policy()."""
+        super().set_retry_policy(max_retries, backoff, max_backoff)
+        self.async_session.retry_policy = self.retry_policy
+
+    async def get_assignments_async(self, course: Course) -> dict[Assignment]:
+        """
+        Gets all assignments from a course.
+
+        Endpoint:
+            v1/courses/{course_id}/assignments/
+
+        Args:
+            course (Course): The course containing the assignments.
+
+        Returns:
+            dict[Assignment]: A dictionary containing Assignment CanvasObjects whose keys are
+                assignment IDs and whose values are the Assignment
+        """
+        url = self.base_api_url + f'/courses/{course.id}/assignments'
+        params = {
+            'per_page': 100
+        }
+        assignment_list = await GET_list_async(self.async_session, self.auth, url, params = params)
+        return list_to_dict(course, Assignment, assignment_list)
+
+    async def get_courses_async(self) -> dict[Course]:
+        """
+        Get all courses associated with the active user.
+
+        Endpoint:
+            v1/courses
+
+        Returns:
+            dict[Courses]: A dictionary whose keys are the ids of courses and whose values are the
+                corresponding Course
+        """
+        url = self.base_api_url + '/courses?per_page=100'
+        course_list = await GET_list_async(self.async_session, self.auth, url)
+        return list_to_dict(self, Course, course_list)
+
+    async def get_entries_async(self, discussion: Discussion) -> dict[Entry]:
+        """
+        Gets all entries from a discussion. The replies that are not in the view (has_more_replies) are requested
+        at the same time before the entries are built, so no blocking requests are made.
+
+        Endpoint:
+            v1/courses/{course_id}/discussion_topics/{discussion_id}/view
+            v1/courses/{course_id}/discussion_topics/{discussion_id}/entries/{entry_id}/replies (when needed)
+
+        Args:
+            discussion (Discussion): The discussion containing the entries.
+
+        Returns:
+            dict[Entry]: A dictionary containing Entry CanvasObjects whose keys are
+                entry IDs and whose values are the Entry
+        """
+        url = self.base_api_url + f'/courses/{discussion.course_id}/discussion_topics/{discussion.id}/view'
+        response = await self.async_session.get(url, headers = self.auth)
+        view = response.json()
+
+        fetched_replies = {}
+        entry_ids = discussion.replies_to_request(view)
+        while entry_ids:
+            reply_lists = await asyncio.gather(*[GET_list_async(self.async_session, self.auth, discussion.replies_url(entry_id),
+                                                                params = {'per_page': 100}) for entry_id in entry_ids])
+            fetched_replies.update(zip(entry_ids, reply_lists))
+            entry_ids = discussion.replies_to_request(view, fetched_replies)
+        return discussion.entries_from_view(view, fetched_replies = fetched_replies)
+
+    async def get_submissions_async(self, parent: CanvasObject) -> dict[Submission]:
+        """
+        Gets all submissions for an Assignment, a User (within their course), or every student in a Course.
+
+        Endpoint:
+            Assignment: v1/courses/{course_id}/assignments/{assignment_id}/submissions
+            User: v1/courses/{course_id}/students/submissions
+            Course: v1/courses/{course_id}/students/submissions
+
+        Args:
+            parent (CanvasObject): An Assignment, User, or Course.
+
+        Returns:
+            dict[Submissions]: A dictionary containing Submission CanvasObjects whose keys are
+                submission IDs and whose values are the Submission
+        """
+        if parent.type == 'Assignment':
+            url = self.base_api_url + f'/courses/{parent.course_id}/assignments/{parent.id}/submissions'
+            params = {}
+        elif parent.type == 'User':
+            url = self.base_api_url + f'/courses/{parent.course_id}/students/submissions'
+            params = {
+                'per_page': 100,
+                'student_ids[]': parent.id
+            }
+        else:
+            url = self.base_api_url + f'/courses/{parent.id}/students/submissions'
+            params = {
+                'per_page': 100,
+                'student_ids[]': 'all'
+            }
+        submission_list = await GET_list_async(self.async_session, self.auth, url, params = params)
+        return list_to_dict(parent, Submission, submission_list)
+
+    async def get_users_async(self, course: Course, enrollment_types: list[str] = ['student']) -> dict[User]:
+        """
+        Gets all user from a course within a certain enrollment type.
+
+        Endpoint:
+            v1/courses/{course_id}/users
+
+        Args:
+            course (Course): The course containing the users.
+            enrollment_type (list[str]): Controls the types of users to be retrieved.
+                - Options: teacher, student, student_view (students plus the test_student),
+                    ta, observer, designer
+
+        Returns:
+            dict[User]: A dictionary containing User CanvasObjects whose keys are
+                user IDs and whose values are the User
+        """
+        url = self.base_api_url + f'/courses/{course.id}/users'
+        user_list = []
+        for enrollment_type in enrollment_types:
+            params = {
+                'per_page': 100,
+                'enrollment_type[]': enrollment_type
+            }
+            temp_user_list = await GET_list_async(self.async_session, self.auth, url, params = params)
+
+            for user in temp_user_list:
+                user['enrollment_type'] = enrollment_type
+
+            user_list += temp_user_list
+        return list_to_dict(course, User, user_list)
@@ -0,0 +1,164 @@
+"""
+Module for the on-disk HTTP response cache for the canvas_access module.
+
+Classes:
+    ResponseCache: Stores API responses in SQLite and revalidates them with conditional requests
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import requests
+
+class ResponseCache:
+    """
+    Stores the body of every GET response that has an ETag or Last-Modified header in a SQLite file. The next time
+    the same URL is requested (with the same API key), the request is sent with If-None-Match / If-Modified-Since.
+    If Canvas answers 304 Not Modified, the stored response is returned instead of downloading the data again.
+
+    Attributes:
+        connection (sqlite3.Connection): Connection to the SQLite file.
+        lock (threading.Lock): Protects the connection when requests are made from multiple threads.
+        path (str): Location of the SQLite file.
+
+    Methods:
+        clear(): Removes all stored responses
+        close(): Closes the SQLite file
+        conditional_headers(): Headers used to revalidate a stored response
+        get(): Gets a stored response
+        key(): Creates the key for a request
+        store(): Stores a response
+        to_response(): Converts a stored response back into a requests.Response
+    """
+
+    def __init__(self, path: str = 'canvas_cache.sqlite'):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread = False)
+        with self.lock, self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, url TEXT, etag TEXT, last_modified TEXT, headers TEXT, body BLOB, stored_at REAL)'
+            )
+
+    def __str__(self):
+        with self.lock:
+            count = self.connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        return f'ResponseCache: {self.path} \t{count} responses'
+
+    def clear(self) -> None:
+        """Removes all stored responses"""
+        with self.lock, self.connection:
+            self.connection.execute('DELETE FROM responses')
+
+    def close(self) -> None:
+        """Closes the SQLite file"""
+        with self.lock:
+            self.connection.close()
+
+    def conditional_headers(self, entry: dict) -> dict:
+        """
+        Headers used to revalidate a stored response.
+
+        Args:
+            entry (dict): A stored response from get().
+
+        Returns:
+            dict: If-None-Match and/or If-Modified-Since headers.
+        """
+        headers = {}
+        if entry['etag'] != None:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified'] != None:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def get(self, key: str) -> dict:
+        """
+        Gets a stored response.
+
+        Args:
+            key (str): The key from key().
+
+        Returns:
+            dict: The stored url, etag, last_modified, headers, and body. None if nothing is stored.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT url, etag, last_modified, headers, body FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+        if row == None:
+            return None
+        return {
+            'url': row[0],
+            'etag': row[1],
+            'last_modified': row[2],
+            'headers': json.loads(row[3]),
+            'body': row[4]
+        }
+
+    def key(self, url: str, params: dict = None, headers: dict = None) -> str:
+        """
+        Creates the key for a request from the full URL (including parameters) and the API key. The API key is
+        hashed so that it is not written to disk, and so that different users do not share responses.
+
+        Args:
+            url (str): The URL of the request.
+            params (dict): Any parameters that will be sent with the request.
+            headers (dict): The headers of the request. Only Authorization is used.
+
+        Returns:
+            str: The key.
+        """
+        full_url = requests.Request('GET', url, params = params).prepare().url
+        authorization = (headers or {}).get('Authorization', '')
+        return hashlib.sha256(f'{authorization}\n{full_url}'.encode()).hexdigest()
+
+    def store(self, key: str, response: requests.Response) -> None:
+        """
+        Stores a response. Responses without an ETag or Last-Modified header cannot be revalidated, so they are skipped.
+
+        Args:
+            key (str): The key from key().
+            response (requests.Response): A successful response.
+
+        Returns:
+            None
+        """
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag == None and last_modified == None:
+            return
+        with self.lock, self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, response.url, etag, last_modified, json.dumps(dict(response.headers)), response.content, time.time())
+            )
+
+    def to_response(self, entry: dict, not_modified: requests.Response) -> requests.Response:
+        """
+        Converts a stored response back into a requests.Response.
+
+        Args:
+            entry (dict): A stored response from get().
+            not_modified (requests.Response): The 304 response. Its headers (such as the rate limit headers)
+                replace the stored headers, except for the ones that describe the (empty) body.
+
+        Returns:
+            requests.Response: A 200 response with the stored body.
+        """
+        response = requests.Response()
+        response.status_code = 200
+        response.headers.update(entry['headers'])
+        for header, value in not_modified.headers.items():
+            if header.lower() not in ['content-encoding', 'content-length', 'content-type', 'transfer-encoding']:
+                response.headers[header] = value
+        response._content = entry['body']
+        response.encoding = not_modified.encoding or 'utf-8'
+        response.url = entry['url']
+        response.request = not_modified.request
+        response.elapsed = not_modified.elapsed
+        response.from_cache = True
+        return response
@@ -1,194 +1,416 @@
-"""
-Module for the base level CanvasObject for the canvas_access module. 
-"""
-
-import requests
-from canvas_access.conversation import Conversation
-from canvas_access.course import Course
-from canvas_access.canvas_object import CanvasObject
-from canvas_access.util import GET_list, list_to_dict
-
-class Canvas(CanvasObject):
-    """
-    Base level login for canvas_access
-
-    Attributes:
-        Universal attributes that will always be inherited by sub-objects:
-            auth (dict): Canvas authorization header.
-            base_api_url (str): Base API URL for Canvas REST API.
-            session (requests.Session): Protocol used for HTTP-stuff.
-            tz (str): pytz timezone string (ie, 'America/Los_Angeles').
-
-        General attributes:
-            info_keys (list[str]): Keys to display with .info().
-            lineage (list[dict]): Keeps track of the CanvasObject lineage
-            type (str): The name of the type of CanvasObject. This is somewhat
-                redundant with the lineage.
-
-        Canvas-level attributes:
-            id (int): Empty attribute to avoid errors later
-            key (str): Canvas API Key
-            key_last_4 (str): Last 4 display for the key        
-            url (str): Base URL for the Canvas instance
-    
-    Methods:
-        get_conversations(): Gets conversations based on various parameters
-        get_conversation(): Gets a single Conversation from the ID
-        get_courses(): Gets all courses for the user 
-        get_course(): Gets a specific course from either a json dictionary or a course ID
-        set_tz(): Sets the timezone for the session
-    """
-
-    def __init__(self, canvas_url, key):
-        self.auth = {'Authorization': 'Bearer {}'.format(key)}
-        self.base_api_url = canvas_url + '/api/v1'
-        self.session = requests.Session()
-        self.tz = None
-
-        self.id = None
-        self.key = key
-        self.key_last_4 = key[-4:]
-        self.lineage = []
-        self.url = canvas_url
-
-        self.info_keys = ['url', 'key_last_4', 'tz']
-        self.type = 'Canvas'
-
-    def __str__(self):
-        return f'{self.type}: {self.base_api_url}'
-    
-    def get_conversation(self, conversation_id) -> Conversation:
-        """
-        Creates a Conversation CanvasObject based on the conversation ID.
-        
-        Endpoint (when used):
-            v1/conversations/{conversation_id}
-
-        Args:
-            conversation_id (int): The conversation ID of the course.
-
-        Returns:
-            Conversation: The Conversation corresdonding to the conversation ID
-        """
-        url = self.base_api_url + f'/conversations/{conversation_id}'
-        return Conversation(self, self.session.get(url, headers = self.auth).json())
-
-
-    def get_conversations(self,
-                          count: int = 25,
-                          filter: list[str] = None,
-                          scope: list[str] = ['read_and_unread'],
-                          parent: CanvasObject = None) -> dict[Conversation]:
-        """
-        Gets conversations semi-intelligently with arguments.
-
-        Endpoint:
-            v1/conversations
-
-        Args:
-            count (int): Sets the number of most recent items per API call. Maximum 100. If set to 0, this will
-                get ALL conversations. Note that if this is done at the Canvas level, it might take a while. This
-                is typically less concerning at the Course or User level.
-            filter (list[str]): Applies filters to the search. Note that object types must be identified,
-                such as cousre_123 and user_123. If providing a parent CanvasObject, those search parameters
-                will be set automatically.
-            scope (list[str]): The API call will run once for each scope.
-                read_and_unread: Default search returns read and unread conversation.
-                unread: Returns unread conversations.
-                starred: Returns starred messages.
-                archived: Returns archived messages.
-                sent: Returns sent messages. Note that sent messages that hvae no responses will be found here.
-
-        Returns:
-            dict[Conversation]: A dictionary whose keys are the ids of conversations and whose values are the
-                corresponding Conversation
-        """
-        url = self.base_api_url + f'/conversations'
-        params = {
-            'filter': [],
-            'scope': scope,
-            'per_page': count
-        }
-        conversation_list = []
-
-        if parent != None:
-            if parent.type == 'Course':
-                params['filter'] += [f'course_{parent.id}']
-            if parent.type == 'User':
-                params['filter'] += [f'user_{parent.id}']
-        if params['filter'] == []:
-            params['filter'] = None
-
-        if filter != None:
-            params['filter'] = filter
-
-        if count == 0:
-            params['per_page'] = 100
-            for scope_type in scope:
-                if scope_type == 'read_and_unread':
-                    conversation_list += GET_list(self.session, self.auth, url, params = params)
-                elif scope_type in ['unread', 'starred', 'archived', 'sent']:
-                    conversation_list += GET_list(self.session, self.auth, url, params = params | {'scope': scope_type})
-        else:
-            for scope_type in scope:
-                if scope_type == 'read_and_unread':
-                    response = self.session.get(url, headers = self.auth, params = params)
-                    conversation_list += response.json()
-                elif scope_type in ['unread', 'starred', 'archived', 'sent']:
-                    response = self.session.get(url, headers = self.auth, params = params | {'scope': scope_type})
-                    conversation_list += response.json()
-        if parent == None:
-            parent = self
-        return list_to_dict(parent, Conversation, conversation_list)
-
-    def get_course(self, course_id: int, json_dict: dict = None) -> Course:
-        """
-        Creates a Course CanvasObject from either a json dictionary or from an API call. If given a json dictionary,
-        the course_id is ignored.
-        
-        Endpoint (when used):
-            v1/courses/{course_id}
-
-        Args:
-            json_dict (dict): A dictionary obtained from an API call representing the contents of a dictionary.
-            course_id (int): The course ID of the course.
-
-        Returns:
-            Course: The Course contained in the json_dict or with the given course_id.
-        """
-        if json_dict == None:
-            url = self.base_api_url + f'/courses/{course_id}'
-            return Course(self, self.session.get(url, headers = self.auth).json())
-        else:
-            return Course(self, json_dict)
-
-    def get_courses(self) -> dict[Course]:
-        """
-        Get all courses associated with the active user.
-        
-        Endpoint:
-            v1/courses
-
-        Args:
-            TODO: Add enrollment types
-
-        Returns:
-            dict[Courses]: A dictionary whose keys are the ids of courses and whose values are the
-                corresponding Course
-        """
-        url = self.base_api_url + '/courses?per_page=100'
-        course_list = GET_list(self.session, self.auth, url)
-        return list_to_dict(self, Course, course_list)
-    
-    def set_tz(self, tz: str) -> None:
-        """
-        Sets the timezone for the Canvas object
-        
-        Args:
-            tz (str): pytz timezone string
-        
-        returns:
-            None
-        """
-        from pytz import timezone
+"""
+Module for the base level CanvasObject for the canvas_access module. 
+"""
+
+from typing import Iterator, Self
+from canvas_access.conversation import Conversation
+from canvas_access.course import Course
+from canvas_access.canvas_object import CanvasObject
+from canvas_access.identity_map import IdentityMap
+from canvas_access.session import CanvasSession, RetryPolicy
+from canvas_access.util import GET_iter, GET_list, list_to_dict
+
+class Canvas(CanvasObject):
+    """
+    Base level login for canvas_access
+
+    Attributes:
+        Universal attributes that will always be inherited by sub-objects:
+            auth (dict): Canvas authorization header.
+            base_api_url (str): Base API URL for Canvas REST API.
+            compact (bool): If True, high-volume CanvasObjects (Submission and Entry) are stored in compact mode.
+            identity_map (IdentityMap): CanvasObjects that were already built, so single lookups can reuse them.
+                It is off (max_size 0) until set_identity_map() is used.
+            search_index (SearchIndex): Optional full-text index that Assignments, Entries, and Messages are added to
+                as they are built. None if there is no index.
+            session (CanvasSession): Protocol used for HTTP-stuff. Every API call is paced by its RateLimiter.
+            tz (str): pytz timezone string (ie, 'America/Los_Angeles').
+
+        General attributes:
+            info_keys (tuple[str]): Keys to display with .info().
+            lineage (tuple[dict]): Keeps track of the CanvasObject lineage
+            type (str): The name of the type of CanvasObject. This is somewhat
+                redundant with the lineage.
+
+        Canvas-level attributes:
+            id (int): Empty attribute to avoid errors later
+            key (str): Canvas API Key
+            key_last_4 (str): Last 4 display for the key        
+            rate_limiter (RateLimiter): The rate limiter of the session. Since the session is inherited, every
+                child CanvasObject shares it.
+            retry_policy (RetryPolicy): The retry policy of the session. Like the rate limiter, it is shared.
+            url (str): Base URL for the Canvas instance
+    
+    Methods:
+        from_snapshot(): Opens a snapshot recorded with Course.snapshot() so the get_* methods work offline
+        get_conversations(): Gets conversations based on various parameters
+        get_conversation(): Gets a single Conversation from the ID
+        get_courses(): Gets all courses for the user 
+        get_course(): Gets a specific course from either a json dictionary or a course ID
+        iter_conversations(): Yields all conversations one at a time
+        iter_courses(): Yields all courses for the user one at a time
+        set_cache(): Turns the on-disk response cache on or off for the session
+        set_compact(): Turns compact mode on or off for Submissions and Entries
+        set_identity_map(): Turns on the reuse of CanvasObjects and sets how long and how many are kept
+        set_retry_policy(): Sets how failed requests are repeated for the session
+        set_search_index(): Turns the full-text search index on or off
+        set_tz(): Sets the timezone for the session
+    """
+
+    info_keys = ('url', 'key_last_4', 'tz')
+
+    def __init__(self, canvas_url, key):
+        self.auth = {'Authorization': 'Bearer {}'.format(key)}
+        self.base_api_url = canvas_url + '/api/v1'
+        self.compact = False
+        self.identity_map = IdentityMap(max_size = 0)
+        self.search_index = None
+        self.session = CanvasSession()
+        self.tz = None
+
+        self.id = None
+        self.key = key
+        self.key_last_4 = key[-4:]
+        self.lineage = ()
+        self.rate_limiter = self.session.rate_limiter
+        self.retry_policy = self.session.retry_policy
+        self.url = canvas_url
+
+        self.type = 'Canvas'
+
+    def __str__(self):
+        return f'{self.type}: {self.base_api_url}'
+    
+    @classmethod
+    def from_snapshot(cls, path: str = 'canvas_snapshot.sqlite') -> Self:
+        """
+        Opens a snapshot recorded with Course.snapshot(). The Canvas answers the same get_* calls that were made
+        during the recording from the SQLite file instead of the API, so no API key or network is needed.
+        Requests that were not recorded raise a KeyError. The identity map keeps every object for the life of
+        the Canvas so that single lookups (such as get_assignment()) are answered once their collection is loaded.
+        A FileNotFoundError is raised if there is no file at path, and a ValueError if the file is not a snapshot.
+
+        Example:
+            canvas = Canvas.from_snapshot('canvas_snapshot.sqlite')
+            course = canvas.get_course(course_id)
+            gradebook = make_gradebook(course)
+
+        Args:
+            path (str): Location of the SQLite file.
+
+        Returns:
+            Canvas: A Canvas whose session reads from the snapshot.
+        """
+        import os
+        from canvas_access.snapshot import Snapshot, SnapshotSession
+        if not os.path.exists(path):
+            raise FileNotFoundError(f'There is no snapshot at {path}')
+        snapshot = Snapshot(path)
+        if snapshot.base_api_url == None:
+            snapshot.close()
+            raise ValueError(f'{path} is not a snapshot recorded with Course.snapshot()')
+        canvas = cls(snapshot.base_api_url.removesuffix('/api/v1'), '')
+        canvas.session = SnapshotSession(snapshot, canvas.rate_limiter, canvas.retry_policy)
+        canvas.set_identity_map(ttl = None, max_size = 10 ** 9)
+        return canvas
+
+    def get_conversation(self, conversation_id) -> Conversation:
+        """
+        Creates a Conversation CanvasObject based on the conversation ID. If the conversation was already
+        built (and has not expired from the identity map), that Conversation is returned without an API call.
+        
+        Endpoint (when used):
+            v1/conversations/{conversation_id}
+
+        Args:
+            conversation_id (int): The conversation ID of the course.
+
+        Returns:
+            Conversation: The Conversation corresdonding to the conversation ID
+        """
+        conversation = self.identity_map.get('Conversation', conversation_id, self)
+        if conversation == None:
+            url = self.base_api_url + f'/conversations/{conversation_id}'
+            conversation = Conversation(self, self.session.get(url, headers = self.auth).json())
+            self.identity_map.add(conversation)
+        return conversation
+
+
+    def get_conversations(self,
+                          count: int = 25,
+                          filter: list[str] = None,
+                          scope: list[str] = ['read_and_unread'],
+                          parent: CanvasObject = None) -> dict[Conversation]:
+        """
+        Gets conversations semi-intelligently with arguments.
+
+        Endpoint:
+            v1/conversations
+
+        Args:
+            count (int): Sets the number of most recent items per API call. Maximum 100. If set to 0, this will
+                get ALL conversations. Note that if this is done at the Canvas level, it might take a while. This
+                is typically less concerning at the Course or User level.
+            filter (list[str]): Applies filters to the search. Note that object types must be identified,
+                such as cousre_123 and user_123. If providing a parent CanvasObject, those search parameters
+                will be set automatically.
+            scope (list[str]): The API call will run once for each scope.
+                read_and_unread: Default search returns read and unread conversation.
+                unread: Returns unread conversations.
+                starred: Returns starred messages.
+                archived: Returns archived messages.
+                sent: Returns sent messages. Note that sent messages that hvae no responses will be found here.
+
+        Returns:
+            dict[Conversation]: A dictionary whose keys are the ids of conversations and whose values are the
+                corresponding Conversation
+        """
+        url = self.base_api_url + f'/conversations'
+        params = {
+            'filter': [],
+            'scope': scope,
+            'per_page': count
+        }
+        conversation_list = []
+
+        if parent != None:
+            if parent.type == 'Course':
+                params['filter'] += [f'course_{parent.id}']
+            if parent.type == 'User':
+                params['filter'] += [f'user_{parent.id}']
+        if params['filter'] == []:
+            params['filter'] = None
+
+        if filter != None:
+            params['filter'] = filter
+
+        if count == 0:
+            params['per_page'] = 100
+            for scope_type in scope:
+                if scope_type == 'read_and_unread':
+                    conversation_list += GET_list(self.session, self.auth, url, params = params)
+                elif scope_type in ['unread', 'starred', 'archived', 'sent']:
+                    conversation_list += GET_list(self.session, self.auth, url, params = params | {'scope': scope_type})
+        else:
+            for scope_type in scope:
+                if scope_type == 'read_and_unread':
+                    response = self.session.get(url, headers = self.auth, params = params)
+                    conversation_list += response.json()
+                elif scope_type in ['unread', 'starred', 'archived', 'sent']:
+                    response = self.session.get(url, headers = self.auth, params = params | {'scope': scope_type})
+                    conversation_list += response.json()
+        if parent == None:
+            parent = self
+        return list_to_dict(parent, Conversation, conversation_list)
+
+    def get_course(self, course_id: int, json_dict: dict = None) -> Course:
+        """
+        Creates a Course CanvasObject from either a json dictionary or from an API call. If given a json dictionary,
+        the course_id is ignored. If the course was already built (and has not expired from the identity map),
+        that Course is returned without an API call.
+        
+        Endpoint (when used):
+            v1/courses/{course_id}
+
+        Args:
+            json_dict (dict): A dictionary obtained from an API call representing the contents of a dictionary.
+            course_id (int): The course ID of the course.
+
+        Returns:
+            Course: The Course contained in the json_dict or with the given course_id.
+        """
+        if json_dict == None:
+            course = self.identity_map.get('Course', course_id, self)
+            if course != None:
+                return course
+            url = self.base_api_url + f'/courses/{course_id}'
+            course = Course(self, self.session.get(url, headers = self.auth).json())
+        else:
+            course = Course(self, json_dict)
+        self.identity_map.add(course)
+        return course
+
+    def get_courses(self) -> dict[Course]:
+        """
+        Get all courses associated with the active user.
+        
+        Endpoint:
+            v1/courses
+
+        Args:
+            TODO: Add enrollment types
+
+        Returns:
+            dict[Courses]: A dictionary whose keys are the ids of courses and whose values are the
+                corresponding Course
+        """
+        url = self.base_api_url + '/courses?per_page=100'
+        course_list = GET_list(self.session, self.auth, url)
+        return list_to_dict(self, Course, course_list)
+    
+    def iter_conversations(self,
+                           filter: list[str] = None,
+                           scope: list[str] = ['read_and_unread'],
+                           parent: CanvasObject = None) -> Iterator[Conversation]:
+        """
+        Yields all conversations one at a time as the pages arrive. This is the streaming version of
+        get_conversations() with count = 0.
+
+        Endpoint:
+            v1/conversations
+
+        Args:
+            filter (list[str]): See get_conversations().
+            scope (list[str]): See get_conversations().
+            parent (CanvasObject): See get_conversations().
+
+        Yields:
+            Conversation: The conversations in the order sent by the API.
+        """
+        url = self.base_api_url + f'/conversations'
+        params = {
+            'filter': [],
+            'scope': scope,
+            'per_page': 100
+        }
+
+        if parent != None:
+            if parent.type == 'Course':
+                params['filter'] += [f'course_{parent.id}']
+            if parent.type == 'User':
+                params['filter'] += [f'user_{parent.id}']
+        if params['filter'] == []:
+            params['filter'] = None
+
+        if filter != None:
+            params['filter'] = filter
+
+        if parent == None:
+            parent = self
+        for scope_type in scope:
+            if scope_type == 'read_and_unread':
+                scope_params = params
+            elif scope_type in ['unread', 'starred', 'archived', 'sent']:
+                scope_params = params | {'scope': scope_type}
+            else:
+                continue
+            for conversation in GET_iter(self.session, self.auth, url, params = scope_params):
+                yield Conversation(parent, conversation)
+
+    def iter_courses(self) -> Iterator[Course]:
+        """
+        Yields all courses associated with the active user one at a time as the pages arrive.
+        
+        Endpoint:
+            v1/courses
+
+        Yields:
+            Course: The courses in the order sent by the API.
+        """
+        url = self.base_api_url + '/courses?per_page=100'
+        for course in GET_iter(self.session, self.auth, url):
+            yield Course(self, course)
+
+    def set_cache(self, path: str = 'canvas_cache.sqlite') -> None:
+        """
+        Turns on an on-disk cache of API responses. Responses are revalidated with Canvas using their ETag or
+        Last-Modified header, so unchanged data costs a 304 response instead of a full download.
+        
+        Args:
+            path (str): Location of the SQLite file. Use None to turn off the cache.
+        
+        returns:
+            None
+        """
+        if self.session.cache != None:
+            self.session.cache.close()
+        if path == None:
+            self.session.cache = None
+        else:
+            from canvas_access.cache import ResponseCache
+            self.session.cache = ResponseCache(path)
+
+    def set_compact(self, compact: bool = True) -> None:
+        """
+        Turns compact mode on or off for Submissions and Entries. In compact mode, only the commonly used API data is
+        stored as attributes and the rest is packed together, which uses much less memory for large collections.
+        All of the data is still available as attributes. Like set_tz(), this only affects objects created afterwards.
+        
+        Args:
+            compact (bool): True to turn on compact mode.
+        
+        returns:
+            None
+        """
+        self.compact = compact
+
+    def set_identity_map(self, ttl: float = 300, max_size: int = 10000) -> None:
+        """
+        Turns on the identity map, so that single lookups (such as get_course() or Course.get_assignment()) reuse
+        CanvasObjects that were already built instead of making an API call, and sets how long and how many are
+        kept. The identity map is off by default because the reused objects can be out of date and are kept in
+        memory. It is changed in place so that the children that already inherited it see the change.
+        
+        Args:
+            ttl (float): Number of seconds an object is kept. None keeps objects until they are dropped for space.
+            max_size (int): The largest number of objects kept. Use 0 to turn off the identity map.
+        
+        returns:
+            None
+        """
+        self.identity_map.ttl = ttl
+        self.identity_map.max_size = max_size
+        if max_size == 0:
+            self.identity_map.clear()
+
+    def set_retry_policy(self, max_retries: int = 5, backoff: float = 0.5, max_backoff: float = 60) -> None:
+        """
+        Sets how requests that fail for transient reasons (429, 5xx, dropped connections) are repeated.
+        Only idempotent requests (such as GET) are repeated.
+        
+        Args:
+            max_retries (int): The number of times a request is repeated. Use 0 to turn off retries.
+            backoff (float): The base wait (in seconds). The wait doubles with each attempt and is randomized.
+            max_backoff (float): The longest wait (in seconds) before a single repeat.
+        
+        returns:
+            None
+        """
+        self.retry_policy = RetryPolicy(max_retries, backoff, max_backoff)
+        self.session.retry_policy = self.retry_policy
+
+    def set_search_index(self, path: str = 'canvas_search.sqlite') -> None:
+        """
+        Turns on a local full-text index (SQLite FTS5) of the text of Assignments, Entries, and Messages. Every one of
+        those objects built afterwards is added to the index, so the text can be searched without the API:
+            canvas.search_index.search('"lab report" late', types = ['Entry', 'Message'], course_id = course_id)
+        Like set_tz(), this only affects objects created afterwards. The previous index is closed, so objects built
+        before (such as a Course) stop adding their children to any index until they are built again from the Canvas.
+        
+        Args:
+            path (str): Location of the SQLite file. Use ':memory:' for an index that is not saved, or None to turn
+                off the index.
+        
+        returns:
+            None
+        """
+        if self.search_index != None:
+            self.search_index.close()
+        if path == None:
+            self.search_index = None
+        else:
+            from canvas_access.search_index import SearchIndex
+            self.search_index = SearchIndex(path)
+
+    def set_tz(self, tz: str) -> None:
+        """
+        Sets the timezone for the Canvas object
+        
+        Args:
+            tz (str): pytz timezone string
+        
+        returns:
+            None
+        """
+        from pytz import timezone
         self.tz = timezone(tz)
\ No newline at end of file
@@ -1,80 +1,217 @@
-"""
-Module for the core CanvasObject functionality. 
-"""
-
-from datetime import datetime
-from typing import Self 
-from canvas_access.util import z_time_str_test, z_time_str_to_dt, dt_to_local_str
-
-class CanvasObject:
-    """
-    A generic object for canvas_access.
-
-    Attributes:
-        id (int): All Canvas objects have an ID.
-        info_keys (list[str]): The list of keys to display when using .info().
-        lineage (list[dict]]): This keeps track of the where the current object came from. This is used for the logic of
-            certain methods and functions. Each dict contains some minimal information such as id and type.
-        type (str): Describes the content of the objects.
-        - Additional attributes will be generated from the API call
-    
-    Methods:
-        all_info(): Displays all of the attributes of the CanvasObject
-        info(): Displays only the attributes listed in info_keys
-        inherit(): Passes data from the parent CanvasObject to the child (self) CanvasObject
-    """
-
-    def __init__(self, json_dict: dict):
-        if 'id' not in self.__dict__.keys():
-            self.id = None
-        if 'info_keys' not in self.__dict__.keys():
-            self.info_keys = []
-        if 'lineage' not in self.__dict__.keys():
-            self.lineage = None
-        if 'type' not in self.__dict__.keys():
-            self.type = 'CanvasObject'
-        
-        for key, item in json_dict.items():
-            self.__dict__[key] = item
-
-            # For time objects, create both a UTC datetime object and local time string
-            # The _display object is a string that shows time in the "most convenient" manner (either local time or Z-time) 
-            if z_time_str_test(item):
-                self.__dict__[key + '_dt'] = z_time_str_to_dt(item)
-                self.__dict__[key + '_display'] = z_time_str_to_dt(item)
-                if 'tz' in self.__dict__:
-                    if self.tz != None:
-                        self.__dict__[key + '_localtime'] = dt_to_local_str(self.__dict__[key + '_dt'], self.tz)
-                        self.__dict__[key + '_display'] = dt_to_local_str(self.__dict__[key + '_dt'], self.tz)
-
-    def all_info(self) -> None:
-        """Displays all attributes"""
-        print(f'{self.type} all info:')
-        for key in sorted(self.__dict__.keys()):
-            print(f'\t{key}:\t{self.__dict__[key]}')
-            
-    def info(self) -> None:
-        """Displays the attributes in info_keys"""
-        print(f'{self.type} info:')
-        for key in ['id'] + self.info_keys:
-            if key in self.__dict__.keys():
-                print(f'\t {key}:\t{self.__dict__[key]}')
-    
-    def inherit(self, parent: Self, additional: list[str] = []) -> None:
-        """
-        Pass information from parent CanvasObject to child (self) CanvasObject. The copy
-        module is important because each object needs its own copy to avoid creating weirdness
-        in references.
-        
-        Arguments:
-            Parent (CanvasObject): The CanvasObject that created the chile (self) CanvasObject
-            additional (list[str]): Additional keys to inherit from the parent
-        """
-        from copy import copy
-        for key in ['session', 'auth', 'tz', 'base_api_url'] + additional:
-            if key in parent.__dict__.keys():
-                self.__dict__[key] = parent.__dict__[key]
-        self.lineage = copy(parent.lineage) + [{
-            'id': parent.id,
-            'type': parent.type
-            }]
\ No newline at end of file
+"""
+Module for the core CanvasObject functionality. 
+"""
+
+from datetime import datetime
+from sys import intern
+from typing import Self 
+from canvas_access.util import clean_html, dt_to_local_str, z_time_str_parse
+
+# Tuples of extra_keys shared by every compact CanvasObject whose API data has the same keys
+EXTRA_KEYS = {}
+
+class CanvasObject:
+    """
+    A generic object for canvas_access.
+
+    Compact mode:
+        Classes that define compact_keys (Submission and Entry) can be stored in a compact form when the Canvas
+        has compact mode turned on (see Canvas.set_compact()). Only the compact_keys are kept as attributes. The
+        rest of the API data is kept in extra_values (in the order of the shared extra_keys tuple), and the
+        inherited attributes are kept in a single dictionary shared by all of the children of the same parent.
+        All of these are still available as attributes. Derived time attributes are computed each time they are
+        used instead of being stored.
+
+    Class attributes:
+        compact_keys (tuple[str]): The API keys kept as attributes in compact mode. None if the class has no compact mode.
+        compact_drop_keys (tuple[str]): API keys that are not kept at all in compact mode.
+        info_keys (tuple[str]): The keys to display when using .info().
+        internal_keys (tuple[str]): Keys of __dict__ that hold the compact storage and the caches shared with the
+            children, so they are not listed by attribute_keys().
+        text_keys (dict[str, str]): Derived plain text attributes (such as message_text) and the HTML attribute each
+            one is converted from with clean_html(). They are only converted the first time they are used.
+
+    Attributes:
+        id (int): All Canvas objects have an ID.
+        lineage (tuple[dict]): This keeps track of the where the current object came from. This is used for the logic of
+            certain methods and functions. Each dict contains some minimal information such as id and type. The tuple
+            is built once by the parent (child_lineage) and shared by all of its children, so it should not be changed.
+        type (str): Describes the content of the objects.
+        - Additional attributes will be generated from the API call
+        - For every Z-time attribute <key>, the derived attributes <key>_dt, <key>_display, and (if there is a
+            timezone) <key>_localtime are created the first time they are used.
+        - Every key of text_keys is created the first time it is used.
+    
+    Methods:
+        all_info(): Displays all of the attributes of the CanvasObject
+        attribute_keys(): Lists the attributes that are stored
+        child_lineage(): The lineage shared by every child of the CanvasObject
+        derived_keys(): Lists the derived time and text attributes that are available
+        info(): Displays only the attributes listed in info_keys
+        inherit(): Passes data from the parent CanvasObject to the child (self) CanvasObject
+    """
+
+    compact_keys = None
+    compact_drop_keys = ()
+    info_keys = ()
+    internal_keys = ('inherited', 'extra_keys', 'extra_values', 'children_lineage', 'compact_children_inherited')
+    text_keys = {}
+
+    def __init__(self, json_dict: dict):
+        if 'id' not in self.__dict__.keys():
+            self.id = None
+        if 'lineage' not in self.__dict__.keys() and 'inherited' not in self.__dict__.keys():
+            self.lineage = None
+        if 'type' not in self.__dict__.keys():
+            self.type = 'CanvasObject'
+        
+        if 'inherited' in self.__dict__.keys():
+            # Short strings (states, grades, times) repeat across many objects, so only one copy of each is kept
+            extra_keys = []
+            extra_values = []
+            for key, item in json_dict.items():
+                if type(item) == str and len(item) <= 32:
+                    item = intern(item)
+                if key in self.compact_keys:
+                    self.__dict__[key] = item
+                elif key not in self.compact_drop_keys:
+                    extra_keys.append(key)
+                    extra_values.append(item)
+            extra_keys = tuple(extra_keys)
+            self.extra_keys = EXTRA_KEYS.setdefault(extra_keys, extra_keys)
+            self.extra_values = tuple(extra_values)
+        else:
+            for key, item in json_dict.items():
+                self.__dict__[key] = item
+
+    def __getattr__(self, name: str):
+        """
+        This is only called when the attribute does not already exist.
+
+        In compact mode, the inherited attributes and the extra API data are looked up first.
+
+        Creates the derived plain text attributes in text_keys the first time they are used.
+
+        Creates the derived time attributes the first time they are used. For time objects, there is both a UTC
+        datetime object (_dt) and a local time string (_localtime). The _display object shows time in the "most
+        convenient" manner (either local time or Z-time). The result is stored so that it is only created once
+        (except in compact mode).
+        """
+        inherited = self.__dict__.get('inherited')
+        if inherited != None:
+            if name in inherited:
+                return inherited[name]
+            extra_keys = self.__dict__['extra_keys']
+            if name in extra_keys:
+                return self.__dict__['extra_values'][extra_keys.index(name)]
+
+        text_key = self.text_keys.get(name)
+        if text_key != None:
+            value = clean_html(getattr(self, text_key, None))
+            if inherited == None:
+                self.__dict__[name] = value
+            return value
+
+        for suffix in ['_localtime', '_display', '_dt']:
+            if name.endswith(suffix):
+                key = name[:-len(suffix)]
+                if key.endswith(('_localtime', '_display', '_dt')):
+                    break
+                item_dt = z_time_str_parse(getattr(self, key, None))
+                if item_dt == None:
+                    break
+                tz = getattr(self, 'tz', None)
+                if suffix == '_dt':
+                    value = item_dt
+                elif tz != None:
+                    value = dt_to_local_str(item_dt, tz)
+                elif suffix == '_display':
+                    value = item_dt
+                else:
+                    break
+                if inherited == None:
+                    self.__dict__[name] = value
+                    if suffix != '_dt' and tz != None:
+                        self.__dict__[key + '_localtime'] = value
+                        self.__dict__[key + '_display'] = value
+                return value
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def all_info(self) -> None:
+        """Displays all attributes, including the derived time attributes"""
+        print(f'{self.type} all info:')
+        for key in sorted(set(self.attribute_keys()) | set(self.derived_keys())):
+            print(f'\t{key}:\t{getattr(self, key)}')
+
+    def attribute_keys(self) -> list[str]:
+        """Lists the attributes that are stored (in compact mode, this includes the inherited and extra attributes)"""
+        keys = [key for key in self.__dict__.keys() if key not in self.internal_keys]
+        inherited = self.__dict__.get('inherited')
+        if inherited == None:
+            return keys
+        return keys + list(inherited.keys()) + list(self.extra_keys)
+
+    def child_lineage(self) -> tuple[dict]:
+        """
+        The lineage of every child of the CanvasObject. It is built the first time it is needed and then shared, so
+        thousands of children (such as the Submissions of an Assignment) do not each keep their own copy.
+
+        Returns:
+            tuple[dict]: The lineage of the CanvasObject followed by the id and type of the CanvasObject.
+        """
+        lineage = self.__dict__.get('children_lineage')
+        if lineage == None or lineage[-1]['id'] != self.id or lineage[-1]['type'] != self.type:
+            lineage = tuple(self.lineage or ()) + ({
+                'id': self.id,
+                'type': self.type
+                },)
+            self.__dict__['children_lineage'] = lineage
+        return lineage
+
+    def derived_keys(self) -> list[str]:
+        """Lists the derived time and text attributes that are available, whether or not they have been created yet"""
+        suffixes = ['_dt', '_display']
+        if getattr(self, 'tz', None) != None:
+            suffixes.append('_localtime')
+        keys = []
+        for key in self.attribute_keys():
+            item = getattr(self, key)
+            if type(item) == str and not key.endswith(('_localtime', '_display', '_dt')) and z_time_str_parse(item) != None:
+                keys += [key + suffix for suffix in suffixes]
+        keys += [key for key, text_key in self.text_keys.items() if hasattr(self, text_key)]
+        return keys
+            
+    def info(self) -> None:
+        """Displays the attributes in info_keys"""
+        print(f'{self.type} info:')
+        for key in ['id', *self.info_keys]:
+            if hasattr(self, key):
+                print(f'\t {key}:\t{getattr(self, key)}')
+    
+    def inherit(self, parent: Self, additional: list[str] = []) -> None:
+        """
+        Pass information from parent CanvasObject to child (self) CanvasObject. The lineage is shared
+        by every child of the parent (see child_lineage()), so it is a tuple to avoid creating weirdness
+        in references.
+
+        In compact mode, the inherited information is instead stored in a single dictionary that is
+        shared by every compact child of the parent that inherits the same keys.
+        
+        Arguments:
+            Parent (CanvasObject): The CanvasObject that created the chile (self) CanvasObject
+            additional (list[str]): Additional keys to inherit from the parent
+        """
+        keys = ['session', 'auth', 'tz', 'base_api_url', 'identity_map', 'compact', 'search_index'] + additional
+        if self.compact_keys != None and parent.__dict__.get('compact', False):
+            inherited_dicts = parent.__dict__.setdefault('compact_children_inherited', {})
+            if tuple(keys) not in inherited_dicts:
+                inherited = {key: parent.__dict__[key] for key in keys if key in parent.__dict__.keys()}
+                inherited['lineage'] = parent.child_lineage()
+                inherited_dicts[tuple(keys)] = inherited
+            self.inherited = inherited_dicts[tuple(keys)]
+            return
+
+        for key in keys:
+            if key in parent.__dict__.keys():
+                self.__dict__[key] = parent.__dict__[key]
+        self.lineage = parent.child_lineage()
\ No newline at end of file
@@ -1,212 +1,450 @@
-"""
-Module for the Course CanvasObject for the canvas_access module. 
-"""
-
-from canvas_access.assignment import Assignment
-from canvas_access.assignment_group import AssignmentGroup
-from canvas_access.canvas_object import CanvasObject
-from canvas_access.discussion import Discussion
-from canvas_access.user import User
-from canvas_access.util import GET_list, list_to_dict
-
-class Course(CanvasObject):
-    """
-    Course CanvasObject for canvas_access.
-
-    Attributes:
-        Universal attributes: auth, base_api_url, session, tz
-        General attributes: info_keys, lineage, type
-        Other inherited attributes: None
-        Course-level attributes:
-            - Others obtained from API
-    
-    Methods:
-        get_assignment(): Get an assignment within a course by assignment ID
-        get_assignments(): Get all assignments within a course
-        get_assignment_group(): Get a single assignment group by assignment group ID
-        get_assignment_groups(): Get all assignment groups within a course
-        get_discussion(): Get a single discussion within a course by ID
-        get_discussion(): Get all discusions within a course
-        get_user(): Get a single user within a course by user ID.
-        get_users(): Get users within a course by category.
-        start_conversation(): Create a new conversation.
-    """
-
-    def __init__(self, canvas, json_dict):
-        self.inherit(canvas)
-
-        super().__init__(json_dict)
-
-        if 'name' not in self.__dict__.keys():
-            self.name = 'N/A'
-        self.info_keys = ['name']
-        self.type = 'Course'
-
-    def __str__(self):
-        return f'{self.type}: {self.id} \t {self.name}'
-
-    def get_assignment(self, assignment_id: int) -> Assignment:
-        """
-        Gets a single assignment from a course.
-
-        Endpoint:
-            v1/courses/{course_id}/assignments/{assignment_id}
-
-        Args:
-            assignment_id (int): The ID of the assignment.
-
-        Returns:
-            Assignment: A CanvasObject representing the assignment.
-        """
-        url = self.base_api_url + f'/courses/{self.id}/assignments/{assignment_id}'
-        return Assignment(self, self.session.get(url, headers = self.auth).json())
-
-    def get_assignments(self) -> dict[Assignment]:
-        """
-        Gets all assignments from a course.
-
-        Endpoint:
-            v1/courses/{course_id}/assignments/
-
-        Args:
-            None
-
-        Returns:
-            dict[Assignment]: A dictionary containing Assignment CanvasObjects whose keys are
-                assignment IDs and whose values are the Assignment
-        """
-        url = self.base_api_url + f'/courses/{self.id}/assignments'
-        params = {
-            'per_page': 100
-        }
-        assignment_list = GET_list(self.session, self.auth, url, params = params)
-        return list_to_dict(self, Assignment, assignment_list)
-
-    def get_assignment_group(self, assignment_group_id):
-        """
-        Gets a single assignment group from a course.
-
-        Endpoint:
-            v1/courses/{course_id}/assignment_groups/{assignment_group_id}
-
-        Args:
-            assignment_group_id (int): The ID of the assignment group.
-
-        Returns:
-            AssignmentGroup: A CanvasObject representing the assignment group.
-        """
-        url = self.base_api_url + f'/courses/{self.id}/assignment_groups/{assignment_group_id}'
-        return AssignmentGroup(self, self.session.get(url, headers = self.auth).json())
-
-    def get_assignment_groups(self) -> dict[AssignmentGroup]:
-        """
-        Gets all assignment groups from a course.
-
-        Endpoint:
-            v1/courses/{course_id}/assignments_groups/
-
-        Args:
-            None
-
-        Returns:
-            dict[AssignmentGroup]: A dictionary containing AssignmentGroup CanvasObjects whose keys are
-                assignment group IDs and whose values are the AssignmentGroup
-        """
-        url = self.base_api_url + f'/courses/{self.id}/assignment_groups'
-        assignment_group_list = GET_list(self.session, self.auth, url)
-        return list_to_dict(self, AssignmentGroup, assignment_group_list)
-
-    def get_discussion(self, topic_id) -> Discussion:
-        """
-        Gets a single discussion from a course.
-
-        Endpoint:
-            v1/courses/{course_id}/discussion_topics/{topic_id}
-
-        Args:
-            topic_id (int): The ID of the discussion topic.
-
-        Returns:
-            Discussion: A CanvasObject representing the discussion.
-        """
-        url = self.base_api_url + f'/courses/{self.id}/discussion_topics/{topic_id}'
-        return Discussion(self, self.session.get(url, headers = self.auth).json())
-
-    def get_discussions(self) -> dict[Discussion]:
-        """
-        Gets all discussions from a course.
-
-        Endpoint:
-            v1/courses/{course_id}/discussion_topics/
-
-        Args:
-            None
-
-        Returns:
-            dict[Discussion]: A dictionary containing Discussion CanvasObjects whose keys are
-                discussion IDs and whose values are the Discussion.
-        """
-        url = self.base_api_url + f'/courses/{self.id}/discussion_topics'
-        params = {
-            'per_page': 100
-        }
-        discussion_list = GET_list(self.session, self.auth, url, params = params)
-        return list_to_dict(self, Discussion, discussion_list)
-
-    def get_user(self, user_id: int) -> User:
-        """
-        Gets a single user from a course.
-
-        Endpoint:
-            v1/courses/{course_id}/users/{user_id}
-
-        Args:
-            user_id (int): The ID of the user.
-
-        Returns:
-            Discussion: A CanvasObject representing the discussion.
-        """
-        url = self.base_api_url + f'/courses/{self.id}/users/{user_id}'
-        params = {
-            'include[]': 'enrollments'
-        }
-        user = User(self, self.session.get(url, headers = self.auth, params = params).json())
-        if user.enrollments[0]['type'] == 'StudentEnrollment':
-            user.enrollment_type = 'student'
-        elif user.enrollments[0]['type'] == 'TeacherEnrollment':
-            user.enrollment_type = 'teacher'
-        else:
-            user.enrollment_type = 'ERROR'
-        return user
-        
-
-    def get_users(self, enrollment_types: list[str] = ['student']) -> dict[User]:
-        """
-        Gets all user from a course within a certain enrollment type.
-
-        Endpoint:
-            v1/courses/{course_id}/users/{user_id}
-
-        Args:
-            user_id (int): The ID of the user.
-            enrollment_type (list[str]): Controls the types of users to be retrieved.
-                - Options: teacher, student, student_view (students plus the test_student),
-                    ta, observer, designer
-
-        Returns:
-            Discussion: A CanvasObject representing the discussion.
-        """
-        url = self.base_api_url + f'/courses/{self.id}/users'
-        user_list = []
-        for enrollment_type in enrollment_types:
-            params = {
-                'per_page': 100,
-                'enrollment_type[]': enrollment_type
-            }
-            temp_user_list = GET_list(self.session, self.auth, url, params = params)
-
-            for user in temp_user_list:
-                user['enrollment_type'] = enrollment_type
-            
-            user_list += temp_user_list
-        return list_to_dict(self, User, user_list)
+"""
+Module for the Course CanvasObject for the canvas_access module. 
+"""
+
+from typing import Iterator
+from canvas_access.assignment import Assignment
+from canvas_access.assignment_group import AssignmentGroup
+from canvas_access.canvas_object import CanvasObject
+from canvas_access.discussion import Discussion
+from canvas_access.submission import Submission
+from canvas_access.user import User
+from canvas_access.util import GET_iter, GET_list, list_to_dict
+
+class Course(CanvasObject):
+    """
+    Course CanvasObject for canvas_access.
+
+    Attributes:
+        Universal attributes: auth, base_api_url, compact, identity_map, search_index, session, tz
+        General attributes: info_keys, lineage, type
+        Other inherited attributes: None
+        Course-level attributes:
+            - Others obtained from API
+    
+    Methods:
+        get_assignment(): Get an assignment within a course by assignment ID
+        get_assignments(): Get all assignments within a course
+        get_assignment_group(): Get a single assignment group by assignment group ID
+        get_assignment_groups(): Get all assignment groups within a course
+        get_all_discussion_entries(): Get the entries of every discussion within a course as columns
+        get_discussion(): Get a single discussion within a course by ID
+        get_discussion(): Get all discusions within a course
+        get_submissions(): Get all student submissions within a course in a single paginated stream
+        get_user(): Get a single user within a course by user ID.
+        get_users(): Get users within a course by category.
+        iter_assignments(): Yield all assignments within a course one at a time
+        iter_submissions(): Yield all student submissions within a course one at a time
+        iter_users(): Yield users within a course by category one at a time
+        snapshot(): Record the course into a local snapshot that can be used offline
+        start_conversation(): Create a new conversation.
+    """
+
+    info_keys = ('name',)
+
+    def __init__(self, canvas, json_dict):
+        self.inherit(canvas)
+
+        super().__init__(json_dict)
+
+        if 'name' not in self.__dict__.keys():
+            self.name = 'N/A'
+        self.type = 'Course'
+
+    def __str__(self):
+        return f'{self.type}: {self.id} \t {self.name}'
+
+    def get_assignment(self, assignment_id: int) -> Assignment:
+        """
+        Gets a single assignment from a course. If the assignment was already built from this course (and has not
+        expired from the identity map), that Assignment is returned without an API call.
+
+        Endpoint:
+            v1/courses/{course_id}/assignments/{assignment_id}
+
+        Args:
+            assignment_id (int): The ID of the assignment.
+
+        Returns:
+            Assignment: A CanvasObject representing the assignment.
+        """
+        assignment = self.identity_map.get('Assignment', assignment_id, self)
+        if assignment == None:
+            url = self.base_api_url + f'/courses/{self.id}/assignments/{assignment_id}'
+            assignment = Assignment(self, self.session.get(url, headers = self.auth).json())
+            self.identity_map.add(assignment)
+        return assignment
+
+    def get_assignments(self) -> dict[Assignment]:
+        """
+        Gets all assignments from a course.
+
+        Endpoint:
+            v1/courses/{course_id}/assignments/
+
+        Args:
+            None
+
+        Returns:
+            dict[Assignment]: A dictionary containing Assignment CanvasObjects whose keys are
+                assignment IDs and whose values are the Assignment
+        """
+        url = self.base_api_url + f'/courses/{self.id}/assignments'
+        params = {
+            'per_page': 100
+        }
+        assignment_list = GET_list(self.session, self.auth, url, params = params)
+        return list_to_dict(self, Assignment, assignment_list)
+
+    def get_assignment_group(self, assignment_group_id):
+        """
+        Gets a single assignment group from a course. If the assignment group was already built (and has not
+        expired from the identity map), that AssignmentGroup is returned without an API call.
+
+        Endpoint:
+            v1/courses/{course_id}/assignment_groups/{assignment_group_id}
+
+        Args:
+            assignment_group_id (int): The ID of the assignment group.
+
+        Returns:
+            AssignmentGroup: A CanvasObject representing the assignment group.
+        """
+        assignment_group = self.identity_map.get('AssignmentGroup', assignment_group_id, self)
+        if assignment_group == None:
+            url = self.base_api_url + f'/courses/{self.id}/assignment_groups/{assignment_group_id}'
+            assignment_group = AssignmentGroup(self, self.session.get(url, headers = self.auth).json())
+            self.identity_map.add(assignment_group)
+        return assignment_group
+
+    def get_assignment_groups(self, include_assignments: bool = False) -> dict[AssignmentGroup]:
+        """
+        Gets all assignment groups from a course.
+
+        Endpoint:
+            v1/courses/{course_id}/assignments_groups/
+
+        Args:
+            include_assignments (bool): If True, the assignments of every group are included in the same paginated
+                call (include[]=assignments) and stored in the assignments attribute of each AssignmentGroup.
+
+        Returns:
+            dict[AssignmentGroup]: A dictionary containing AssignmentGroup CanvasObjects whose keys are
+                assignment group IDs and whose values are the AssignmentGroup
+        """
+        url = self.base_api_url + f'/courses/{self.id}/assignment_groups'
+        params = {
+            'per_page': 100
+        }
+        if include_assignments:
+            params['include[]'] = 'assignments'
+        assignment_group_list = GET_list(self.session, self.auth, url, params = params)
+        return list_to_dict(self, AssignmentGroup, assignment_group_list)
+
+    def get_all_discussion_entries(self, workers: int = 4, since: str = None) -> dict[str, list]:
+        """
+        Gets the entries of every discussion in a course as a single table of columns, which is the usual
+        starting point for participation statistics (for example, pandas.DataFrame(table)). The discussion views
+        are requested at the same time and the Entries are not kept, so only the columns stay in memory.
+
+        Endpoint:
+            v1/courses/{course_id}/discussion_topics/
+            v1/courses/{course_id}/discussion_topics/{discussion_id}/view (once per discussion)
+
+        Args:
+            workers (int): The maximum number of discussion views requested at the same time.
+            since (str): Optional Z-time string. Only entries created or edited after this time are included.
+
+        Returns:
+            dict[str, list]: Equal length lists for topic_id, entry_id, parent_id, user_id, created_at (Z-time
+                string), and word_count (the number of words in the plain text of the message, 0 if deleted).
+                The rows are grouped by discussion in the order of get_discussions(), each in thread order.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        columns = ['topic_id', 'entry_id', 'parent_id', 'user_id', 'created_at', 'word_count']
+
+        def get_rows(discussion):
+            rows = []
+            for entry in discussion.iter_entries(since):
+                deleted = getattr(entry, 'deleted', False) == True
+                rows.append((discussion.id, entry.id, entry.parent_id, getattr(entry, 'user_id', None),
+                             getattr(entry, 'created_at', None), 0 if deleted else len((entry.message_text or '').split())))
+            return rows
+
+        discussions = list(self.get_discussions().values())
+        table = {column: [] for column in columns}
+        with ThreadPoolExecutor(max_workers = max(min(workers, len(discussions)), 1)) as executor:
+            for rows in executor.map(get_rows, discussions):
+                for column, values in zip(columns, zip(*rows)):
+                    table[column] += values
+        return table
+
+    def get_discussion(self, topic_id) -> Discussion:
+        """
+        Gets a single discussion from a course. If the discussion was already built (and has not expired from
+        the identity map), that Discussion is returned without an API call.
+
+        Endpoint:
+            v1/courses/{course_id}/discussion_topics/{topic_id}
+
+        Args:
+            topic_id (int): The ID of the discussion topic.
+
+        Returns:
+            Discussion: A CanvasObject representing the discussion.
+        """
+        discussion = self.identity_map.get('Discussion', topic_id, self)
+        if discussion == None:
+            url = self.base_api_url + f'/courses/{self.id}/discussion_topics/{topic_id}'
+            discussion = Discussion(self, self.session.get(url, headers = self.auth).json())
+            self.identity_map.add(discussion)
+        return discussion
+
+    def get_discussions(self) -> dict[Discussion]:
+        """
+        Gets all discussions from a course.
+
+        Endpoint:
+            v1/courses/{course_id}/discussion_topics/
+
+        Args:
+            None
+
+        Returns:
+            dict[Discussion]: A dictionary containing Discussion CanvasObjects whose keys are
+                discussion IDs and whose values are the Discussion.
+        """
+        url = self.base_api_url + f'/courses/{self.id}/discussion_topics'
+        params = {
+            'per_page': 100
+        }
+        discussion_list = GET_list(self.session, self.auth, url, params = params)
+        return list_to_dict(self, Discussion, discussion_list)
+
+    def get_submissions(self, students: dict[User] = None, submitted_since: str = None, graded_since: str = None) -> dict[Submission]:
+        """
+        Gets all submissions from all students in a course using a single paginated stream instead of
+        one call per student. If a dictionary of students is provided, each Submission is created with
+        its User as the parent so it matches the output of User.get_submissions().
+
+        Endpoint:
+            v1/courses/{course_id}/students/submissions
+
+        Args:
+            students (dict[User]): Optional dictionary of Users indexed by user ID, typically from get_users().
+            submitted_since (str): Optional Z-time string. Only submissions submitted after this time are returned.
+            graded_since (str): Optional Z-time string. Only submissions graded after this time are returned.
+                If both are used, Canvas only returns submissions that meet both conditions.
+
+        Returns:
+            dict[Submission]: A dictionary containing Submission CanvasObjects whose keys are
+                submission IDs and whose values are the Submission.
+        """
+        url = self.base_api_url + f'/courses/{self.id}/students/submissions'
+        params = {
+            'per_page': 100,
+            'student_ids[]': 'all'
+        }
+        if submitted_since != None:
+            params['submitted_since'] = submitted_since
+        if graded_since != None:
+            params['graded_since'] = graded_since
+        submission_list = GET_list(self.session, self.auth, url, params = params)
+        if students == None:
+            return list_to_dict(self, Submission, submission_list)
+
+        submission_dict = {}
+        for submission in submission_list:
+            parent = students.get(submission['user_id'], self)
+            submission_dict[submission['id']] = Submission(parent, submission)
+            self.identity_map.add(submission_dict[submission['id']])
+        return submission_dict
+
+    def get_user(self, user_id: int) -> User:
+        """
+        Gets a single user from a course, including their enrollments. If the user was already built by get_user()
+        from this course (and has not expired from the identity map), that User is returned without an API call.
+
+        Endpoint:
+            v1/courses/{course_id}/users/{user_id}
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            Discussion: A CanvasObject representing the discussion.
+        """
+        # Users from get_users() do not have enrollments, so only the ones built here are reused
+        user = self.identity_map.get('User', user_id, self)
+        if user != None and 'enrollments' in user.__dict__.keys():
+            return user
+
+        url = self.base_api_url + f'/courses/{self.id}/users/{user_id}'
+        params = {
+            'include[]': 'enrollments'
+        }
+        user = User(self, self.session.get(url, headers = self.auth, params = params).json())
+        if user.enrollments[0]['type'] == 'StudentEnrollment':
+            user.enrollment_type = 'student'
+        elif user.enrollments[0]['type'] == 'TeacherEnrollment':
+            user.enrollment_type = 'teacher'
+        else:
+            user.enrollment_type = 'ERROR'
+        self.identity_map.add(user)
+        return user
+        
+
+    def get_users(self, enrollment_types: list[str] = ['student']) -> dict[User]:
+        """
+        Gets all user from a course within a certain enrollment type.
+
+        Endpoint:
+            v1/courses/{course_id}/users/{user_id}
+
+        Args:
+            user_id (int): The ID of the user.
+            enrollment_type (list[str]): Controls the types of users to be retrieved.
+                - Options: teacher, student, student_view (students plus the test_student),
+                    ta, observer, designer
+
+        Returns:
+            Discussion: A CanvasObject representing the discussion.
+        """
+        url = self.base_api_url + f'/courses/{self.id}/users'
+        user_list = []
+        for enrollment_type in enrollment_types:
+            params = {
+                'per_page': 100,
+                'enrollment_type[]': enrollment_type
+            }
+            temp_user_list = GET_list(self.session, self.auth, url, params = params)
+
+            for user in temp_user_list:
+                user['enrollment_type'] = enrollment_type
+            
+            user_list += temp_user_list
+        return list_to_dict(self, User, user_list)
+
+
+    def iter_assignments(self) -> Iterator[Assignment]:
+        """
+        Yields all assignments from a course one at a time as the pages arrive.
+
+        Endpoint:
+            v1/courses/{course_id}/assignments/
+
+        Yields:
+            Assignment: The assignments in the order sent by the API.
+        """
+        url = self.base_api_url + f'/courses/{self.id}/assignments'
+        params = {
+            'per_page': 100
+        }
+        for assignment in GET_iter(self.session, self.auth, url, params = params):
+            yield Assignment(self, assignment)
+
+    def iter_submissions(self, students: dict[User] = None) -> Iterator[Submission]:
+        """
+        Yields all submissions from all students in a course one at a time as the pages arrive.
+
+        Endpoint:
+            v1/courses/{course_id}/students/submissions
+
+        Args:
+            students (dict[User]): See get_submissions().
+
+        Yields:
+            Submission: The submissions in the order sent by the API.
+        """
+        url = self.base_api_url + f'/courses/{self.id}/students/submissions'
+        params = {
+            'per_page': 100,
+            'student_ids[]': 'all'
+        }
+        for submission in GET_iter(self.session, self.auth, url, params = params):
+            if students == None:
+                yield Submission(self, submission)
+            else:
+                yield Submission(students.get(submission['user_id'], self), submission)
+
+    def iter_users(self, enrollment_types: list[str] = ['student']) -> Iterator[User]:
+        """
+        Yields all users from a course within a certain enrollment type one at a time as the pages arrive.
+
+        Endpoint:
+            v1/courses/{course_id}/users
+
+        Args:
+            enrollment_type (list[str]): See get_users().
+
+        Yields:
+            User: The users in the order sent by the API.
+        """
+        url = self.base_api_url + f'/courses/{self.id}/users'
+        for enrollment_type in enrollment_types:
+            params = {
+                'per_page': 100,
+                'enrollment_type[]': enrollment_type
+            }
+            for user in GET_iter(self.session, self.auth, url, params = params):
+                user['enrollment_type'] = enrollment_type
+                yield User(self, user)
+
+    def snapshot(self, path: str = 'canvas_snapshot.sqlite', workers: int = 4) -> None:
+        """
+        Records the course into a local SQLite snapshot so that it can be analyzed later without using the API
+        (see Canvas.from_snapshot()). Every GET response of the crawl is recorded under its full URL, so the
+        snapshot answers the same get_* calls that were made here:
+            - the course, its assignments, and its assignment groups (with and without include_assignments)
+            - the assignments of each assignment group
+            - the users of every enrollment type
+            - the submissions of the course, of each assignment, and of each student
+            - the discussions and the entries of each discussion
+            - the conversations of the course (as get_conversations(count = 0, parent = course)) and their messages
+        Single lookups (such as get_assignment()) are answered from the identity map once the collection has been
+        loaded from the snapshot.
+
+        Args:
+            path (str): Location of the SQLite file. If it already exists, the course is added to it.
+            workers (int): The maximum number of API calls made at the same time for the per-object collections.
+
+        Returns:
+            None
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from canvas_access.canvas import Canvas
+        from canvas_access.snapshot import Snapshot
+
+        snapshot = Snapshot(path, self.base_api_url)
+        recorder = self.session.recorder
+        self.session.recorder = snapshot
+        try:
+            print(f'Recording {self.name} ({self.id}) into {path}')
+            self.session.get(self.base_api_url + f'/courses/{self.id}', headers = self.auth)
+            assignments = self.get_assignments()
+            assignment_groups = self.get_assignment_groups()
+            self.get_assignment_groups(include_assignments = True)
+            students = self.get_users()
+            self.get_users(['teacher', 'ta', 'observer', 'designer', 'student_view'])
+            self.get_submissions()
+            discussions = self.get_discussions()
+            # The conversations are requested through a Canvas that shares this session, so the recorded URL is
+            # the one that get_conversations(count = 0, parent = course) requests from the snapshot
+            canvas = Canvas(self.base_api_url.removesuffix('/api/v1'), '')
+            canvas.auth = self.auth
+            canvas.session = self.session
+            conversations = canvas.get_conversations(count = 0, parent = self)
+
+            jobs = [assignment_group.get_assignments for assignment_group in assignment_groups.values()]
+            jobs += [assignment.get_submissions for assignment in assignments.values()]
+            jobs += [student.get_submissions for student in students.values()]
+            jobs += [discussion.get_entries for discussion in discussions.values()]
+            jobs += [conversation.get_messages for conversation in conversations.values()]
+            print(f'Recording {len(jobs)} collections')
+            with ThreadPoolExecutor(max_workers = max(workers, 1)) as executor:
+                list(executor.map(lambda job: job(), jobs))
+            print(snapshot)
+        finally:
+            self.session.recorder = recorder
+            snapshot.close()
\ No newline at end of file
@@ -1,84 +1,211 @@
-"""
-Module for the Discussion CanvasObject for the canvas_access module. 
-"""
-
-from canvas_access.canvas_object import CanvasObject
-from canvas_access.entry import Entry
-from canvas_access.util import GET_list, list_to_dict
-
-class Discussion(CanvasObject):
-    """
-    Discussion CanvasObject for canvas_access.
-
-    Attributes:
-        Universal attributes: auth, base_api_url, session, tz
-        General attributes: info_keys, lineage, type
-        Other inherited attributes: None
-        Course-level attributes:
-            reply_list (list[int]): A list of replies to the entry
-            - Others obtained from API
-    
-    Methods:
-        get_entries(): Get all assignments within the discussion
-    """
-    def __init__(self, course, json_dict):
-        self.inherit(course)
-        self.course_id = course.id
-        self.course_name = course.name
-
-        self.info_keys = ['course_id', 'course_name', 'title']
-        self.type = 'Discussion'
-
-        super().__init__(json_dict)
-    
-    def __str__(self):
-        return f'{self.type} [Course ID: {self.course_id}]: {self.id} \t {self.title}'
-    
-    def get_entries(self) -> dict[Entry]:
-        """
-        Gets all entries from a conversation.
-
-        Endpoint:
-            v1/courses/{course_id}/discussion_topics/{discussion_id}/view
-        
-        Args:
-            None
-        
-        Returns:
-            dict[Entry]: A dictionary containing Entry CanvasObjects whose keys are
-                entry IDs and whose values are the Entry
-
-
-        NOTE: May eventually need to deal with "has_more_replies" flag?
-        """
-        def get_replies(entry):
-            """Recursively convert replies to entries"""
-            replies = []
-            if 'replies' in entry.keys():
-                for reply in entry['replies']:
-                    replies.append(reply)
-                    replies += get_replies(reply)
-            return replies
-
-        url = self.base_api_url + f'/courses/{self.course_id}/discussion_topics/{self.id}/view'
-        response = self.session.get(url, headers = self.auth)
-
-        self.participants = response.json()['participants']
-        initial_entries = response.json()['view']
-        replies = []
-        for entry in initial_entries:
-            replies += get_replies(entry)
-        entry_list = initial_entries + replies
-
-        entry_dict = list_to_dict(self, Entry, entry_list)
-
-        for entry_id, entry in entry_dict.items():
-            if 'user_id' in entry.__dict__.keys():
-                entry.user_name = [participant['display_name']
-                                    for participant in self.participants
-                                    if participant['id'] == entry.user_id][0]
-            if entry.parent_id != None:
-                entry_dict[entry.parent_id].reply_list += [entry_id]
-            
-        
-        return entry_dict
+"""
+Module for the Discussion CanvasObject for the canvas_access module. 
+"""
+
+from typing import Iterator
+from canvas_access.canvas_object import CanvasObject
+from canvas_access.entry import Entry
+from canvas_access.util import GET_list, list_to_dict
+
+class Discussion(CanvasObject):
+    """
+    Discussion CanvasObject for canvas_access.
+
+    Attributes:
+        Universal attributes: auth, base_api_url, compact, identity_map, search_index, session, tz
+        General attributes: info_keys, lineage, type
+        Other inherited attributes: None
+        Course-level attributes:
+            reply_list (list[int]): A list of replies to the entry
+            - Others obtained from API
+    
+    Methods:
+        entries_from_view(): Convert the contents of the discussion view into Entries
+        get_entries(): Get all entries within the discussion
+        iter_entries(): Yield all entries within the discussion one at a time
+        iter_view(): Yield the entries in the contents of the discussion view one at a time
+        replies_to_request(): List the entries whose replies must be requested from the replies endpoint
+        replies_url(): The URL of the replies endpoint for an entry
+    """
+
+    info_keys = ('course_id', 'course_name', 'title')
+
+    def __init__(self, course, json_dict):
+        self.inherit(course)
+        self.course_id = course.id
+        self.course_name = course.name
+
+        self.type = 'Discussion'
+
+        super().__init__(json_dict)
+    
+    def __str__(self):
+        return f'{self.type} [Course ID: {self.course_id}]: {self.id} \t {self.title}'
+    
+    def get_entries(self, since: str = None) -> dict[Entry]:
+        """
+        Gets all entries from a discussion. Replies that were left out of the view (has_more_replies) and entries
+        that were added after the view was cached (new_entries) are included.
+
+        Endpoint:
+            v1/courses/{course_id}/discussion_topics/{discussion_id}/view
+            v1/courses/{course_id}/discussion_topics/{discussion_id}/entries/{entry_id}/replies (when needed)
+        
+        Args:
+            since (str): Optional Z-time string. Only entries created or edited after this time are returned.
+        
+        Returns:
+            dict[Entry]: A dictionary containing Entry CanvasObjects whose keys are
+                entry IDs and whose values are the Entry
+        """
+        url = self.base_api_url + f'/courses/{self.course_id}/discussion_topics/{self.id}/view'
+        response = self.session.get(url, headers = self.auth)
+        return self.entries_from_view(response.json(), since)
+
+    def entries_from_view(self, view: dict, since: str = None, fetched_replies: dict[list[dict]] = None) -> dict[Entry]:
+        """
+        Converts the contents of the discussion view into entries. This is separated from get_entries() so
+        that the view can be obtained in other ways (such as AsyncCanvas).
+
+        Args:
+            view (dict): The json dictionary returned by the discussion view endpoint.
+            since (str): See get_entries().
+            fetched_replies (dict[list[dict]]): See iter_view().
+
+        Returns:
+            dict[Entry]: A dictionary containing Entry CanvasObjects whose keys are
+                entry IDs and whose values are the Entry
+        """
+        identity_map = self.__dict__.get('identity_map')
+        entry_dict = {}
+        for entry in self.iter_view(view, since, fetched_replies):
+            entry_dict[entry.id] = entry
+            if identity_map != None:
+                identity_map.add(entry)
+        return entry_dict
+
+    def iter_entries(self, since: str = None) -> Iterator[Entry]:
+        """
+        Yields the entries of a discussion one at a time in thread order (each entry is followed by its replies).
+        See get_entries().
+
+        Endpoint:
+            v1/courses/{course_id}/discussion_topics/{discussion_id}/view
+            v1/courses/{course_id}/discussion_topics/{discussion_id}/entries/{entry_id}/replies (when needed)
+
+        Args:
+            since (str): Optional Z-time string. Only entries created or edited after this time are yielded.
+
+        Yields:
+            Entry: The entries in thread order.
+        """
+        url = self.base_api_url + f'/courses/{self.course_id}/discussion_topics/{self.id}/view'
+        response = self.session.get(url, headers = self.auth)
+        yield from self.iter_view(response.json(), since)
+
+    def iter_view(self, view: dict, since: str = None, fetched_replies: dict[list[dict]] = None) -> Iterator[Entry]:
+        """
+        Yields the entries in the discussion view one at a time in thread order. The tree is walked with a stack
+        instead of recursion, so long reply chains do not reach the recursion limit, and each Entry is created only
+        when it is reached. Entries marked with has_more_replies (including replies that came from the replies
+        endpoint) have the rest of their replies requested from the replies endpoint, unless they are already in
+        fetched_replies. The new_entries of the view are placed under their parents, even when the parent is itself
+        a new entry whose parent is not in the view. Each entry is yielded once.
+
+        Args:
+            view (dict): The json dictionary returned by the discussion view endpoint.
+            since (str): Optional Z-time string. Only entries created or edited after this time are yielded. The
+                replies of older entries are still checked.
+            fetched_replies (dict[list[dict]]): Replies that were already requested (see replies_to_request()),
+                indexed by the id of the entry they reply to, in the order sent by the replies endpoint. Replies
+                that are requested here are added to it.
+
+        Yields:
+            Entry: The entries in thread order. The reply_list of each Entry is complete when it is yielded.
+        """
+        self.participants = view['participants']
+        participant_names = {participant['id']: participant['display_name'] for participant in self.participants}
+
+        # Entries that are not in the tree yet, indexed by the id of their parent
+        new_replies = {}
+        for entry in view.get('new_entries') or []:
+            new_replies.setdefault(entry.get('parent_id'), []).append(entry)
+
+        if fetched_replies == None:
+            fetched_replies = {}
+        seen = set()
+        stack = list(reversed(view['view'] + new_replies.pop(None, [])))
+        while stack or new_replies:
+            if not stack:
+                # New entries whose parent is not in the view. Only the ones whose parent is not another new entry
+                # start a thread, so the rest are still placed under their parents.
+                new_ids = {entry['id'] for entries in new_replies.values() for entry in entries}
+                parent_ids = [parent_id for parent_id in new_replies.keys() if parent_id not in new_ids]
+                for parent_id in parent_ids or list(new_replies.keys()):
+                    stack += new_replies.pop(parent_id)
+                stack.reverse()
+            entry = stack.pop()
+            entry_id = entry['id']
+            if entry_id in seen:
+                continue
+            seen.add(entry_id)
+
+            replies = {}
+            for reply in entry.get('replies', []) + entry.get('recent_replies', []) + new_replies.pop(entry_id, []):
+                replies.setdefault(reply['id'], reply)
+            if entry.get('has_more_replies', False):
+                if entry_id not in fetched_replies:
+                    fetched_replies[entry_id] = GET_list(self.session, self.auth, self.replies_url(entry_id), params = {'per_page': 100})
+                # The replies endpoint sends the newest replies first
+                for reply in reversed(fetched_replies[entry_id]):
+                    replies.setdefault(reply['id'], reply)
+            replies = [reply for reply in replies.values() if reply['id'] not in seen]
+
+            if since == None or (entry.get('updated_at') or entry.get('created_at') or '') > since:
+                entry_object = Entry(self, entry)
+                if 'user_id' in entry_object.__dict__.keys():
+                    entry_object.user_name = participant_names.get(entry_object.user_id)
+                entry_object.reply_list = [reply['id'] for reply in replies]
+                yield entry_object
+            stack += reversed(replies)
+
+    def replies_to_request(self, view: dict, fetched_replies: dict[list[dict]] = {}) -> list[int]:
+        """
+        Lists the entries whose replies iter_view() would request from the replies endpoint, so that they can be
+        requested ahead of time (such as by AsyncCanvas). Replies from the endpoint can be marked with
+        has_more_replies as well, so this is repeated with the new fetched_replies until it is empty.
+
+        Args:
+            view (dict): The json dictionary returned by the discussion view endpoint.
+            fetched_replies (dict[list[dict]]): See iter_view().
+
+        Returns:
+            list[int]: The ids of the entries marked with has_more_replies that are not in fetched_replies.
+        """
+        entry_ids = []
+        seen = set()
+        stack = view['view'] + (view.get('new_entries') or [])
+        while stack:
+            entry = stack.pop()
+            if entry['id'] in seen:
+                continue
+            seen.add(entry['id'])
+            if entry.get('has_more_replies', False) and entry['id'] not in fetched_replies:
+                entry_ids.append(entry['id'])
+            stack += entry.get('replies', []) + entry.get('recent_replies', []) + fetched_replies.get(entry['id'], [])
+        return entry_ids
+
+    def replies_url(self, entry_id: int) -> str:
+        """
+        The URL of the replies endpoint for an entry.
+
+        Endpoint:
+            v1/courses/{course_id}/discussion_topics/{discussion_id}/entries/{entry_id}/replies
+
+        Args:
+            entry_id (int): The id of the entry.
+
+        Returns:
+            str: The URL.
+        """
+        return self.base_api_url + f'/courses/{self.course_id}/discussion_topics/{self.id}/entries/{entry_id}/replies'
@@ -1,42 +1,49 @@
-"""
-Module for the Entry CanvasObject for the canvas_access module. 
-"""
-
-from canvas_access.canvas_object import CanvasObject
-from canvas_access.util import clean_html, GET_list, list_to_dict
-
-class Entry(CanvasObject):
-    """
-    Entry CanvasObject for canvas_access.
-
-    Attributes:
-        Universal attributes: auth, base_api_url, session, tz
-        General attributes: info_keys, lineage, type
-        Other inherited attributes: course_id, course_name, discussion_id, discussion_title
-        Course-level attributes:
-            message_text (str): A plain text version of the message.
-            user_name (str): Display name of the user
-            - Others obtained from API
-    
-    Methods:
-        None
-    """
-    def __init__(self, discussion, json_dict):
-        self.inherit(discussion, ['course_id', 'course_name'])
-        self.discussion_id = discussion.id
-        self.discussion_title = discussion.title
-
-        self.info_keys = ['course_id', 'course_name', 'discussion_id', 'id', 'user_name']
-        self.type = 'Entry'
-        self.reply_list = []
-
-        super().__init__(json_dict)
-
-        if 'deleted' in self.__dict__.keys():
-            if self.deleted == True:
-                self.message = 'DELETED MESSAGE'
-                self.user_id = self.editor_id
-        self.message_text = clean_html(self.message)
-
-    def __str__(self):
+"""
+Module for the Entry CanvasObject for the canvas_access module. 
+"""
+
+from canvas_access.canvas_object import CanvasObject
+from canvas_access.util import GET_list, list_to_dict
+
+class Entry(CanvasObject):
+    """
+    Entry CanvasObject for canvas_access.
+
+    Attributes:
+        Universal attributes: auth, base_api_url, compact, identity_map, search_index, session, tz
+        General attributes: info_keys, lineage, type
+        Other inherited attributes: course_id, course_name, discussion_id, discussion_title
+        Course-level attributes:
+            message_text (str): A plain text version of the message. It is created the first time it is used.
+            user_name (str): Display name of the user
+            - Others obtained from API
+    
+    Methods:
+        None
+    """
+
+    info_keys = ('course_id', 'course_name', 'discussion_id', 'id', 'user_name')
+    compact_keys = ('id', 'user_id', 'parent_id', 'editor_id', 'deleted', 'message', 'created_at', 'updated_at')
+    # The nested replies are already represented by the reply_list of each Entry
+    compact_drop_keys = ('replies',)
+    text_keys = {'message_text': 'message'}
+    def __init__(self, discussion, json_dict):
+        self.inherit(discussion, ['course_id', 'course_name'])
+        self.discussion_id = discussion.id
+        self.discussion_title = discussion.title
+
+        self.type = 'Entry'
+        self.reply_list = []
+
+        super().__init__(json_dict)
+
+        if 'deleted' in self.__dict__.keys():
+            if self.deleted == True:
+                self.message = 'DELETED MESSAGE'
+                self.user_id = self.editor_id
+        if getattr(self, 'search_index', None) != None:
+            self.search_index.add(self, self.discussion_title, getattr(self, 'message', None),
+                                  getattr(self, 'user_id', None), self.discussion_id, html = True)
+
+    def __str__(self):
         return f'{self.type} [Course ID: {self.course_id}]: {self.id} \tAuthor: {self.user_name} \tReply to: {self.parent_id} \tReplies: {self.reply_list}'
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+Module for the identity map used by the canvas_access module.
+
+Classes:
+    IdentityMap: Keeps the CanvasObjects that were already built so they can be looked up again without an API call
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+class IdentityMap:
+    """
+    Keeps the CanvasObjects that were already built for a Canvas, indexed by (type, id), so that looking up the same
+    object again returns the object that already exists instead of making another API call. The Canvas CanvasObject
+    creates one of these and every child CanvasObject inherits it. Objects expire after ttl seconds, and the least
+    recently used objects are dropped once there are more than max_size of them.
+
+    Attributes:
+        lock (threading.Lock): Protects the map when objects are built from multiple threads.
+        max_size (int): The largest number of objects kept. Use 0 to keep nothing.
+        objects (OrderedDict): The objects (and the time they were added) indexed by (type, id), oldest use first.
+        ttl (float): Number of seconds an object is kept. None keeps objects until they are dropped for space.
+
+    Methods:
+        add(): Adds a CanvasObject
+        clear(): Removes all of the objects
+        get(): Gets a CanvasObject by type and id
+    """
+
+    def __init__(self, ttl: float = 300, max_size: int = 10000):
+        self.lock = threading.Lock()
+        self.max_size = max_size
+        self.objects = OrderedDict()
+        self.ttl = ttl
+
+    def __len__(self):
+        return len(self.objects)
+
+    def __str__(self):
+        return f'IdentityMap: {len(self.objects)} objects \tttl: {self.ttl} \tmax size: {self.max_size}'
+
+    def add(self, canvas_object: 'CanvasObject') -> None: # type: ignore
+        """
+        Adds a CanvasObject, replacing any object with the same type and id.
+
+        Args:
+            canvas_object (CanvasObject): The object to add.
+
+        Returns:
+            None
+        """
+        if canvas_object.id == None or self.max_size == 0:
+            return
+        key = (canvas_object.type, canvas_object.id)
+        with self.lock:
+            self.objects[key] = (canvas_object, time.monotonic())
+            self.objects.move_to_end(key)
+            while len(self.objects) > self.max_size:
+                self.objects.popitem(last = False)
+
+    def clear(self) -> None:
+        """Removes all of the objects"""
+        with self.lock:
+            self.objects.clear()
+
+    def get(self, type: str, id: int, parent: 'CanvasObject' = None) -> 'CanvasObject': # type: ignore
+        """
+        Gets a CanvasObject by type and id.
+
+        Args:
+            type (str): The type of the CanvasObject, such as 'Course'.
+            id (int): The id of the CanvasObject.
+            parent (CanvasObject): If provided, the object is only returned if it was created by a parent with the same
+                type and id. This matters for objects such as Users whose attributes depend on the Course.
+
+        Returns:
+            CanvasObject: The object, or None if it is not in the map or has expired.
+        """
+        key = (type, id)
+        with self.lock:
+            if key not in self.objects:
+                return None
+            canvas_object, added = self.objects[key]
+            if self.ttl != None and time.monotonic() - added > self.ttl:
+                del self.objects[key]
+                return None
+            self.objects.move_to_end(key)
+        if parent != None:
+            if len(canvas_object.lineage) == 0 or \
+                canvas_object.lineage[-1]['type'] != parent.type or canvas_object.lineage[-1]['id'] != parent.id:
+                return None
+        return canvas_object
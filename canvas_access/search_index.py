@@ -0,0 +1,165 @@
+"""
+Module for the local full-text search index for the canvas_access module.
+
+Classes:
+    SearchIndex: Indexes the text of Assignments, Entries, and Messages in SQLite FTS5 as they are built
+"""
+
+import sqlite3
+import threading
+from canvas_access.util import clean_html
+
+class SearchIndex:
+    """
+    A full-text index (SQLite FTS5) of the text of Assignments (name and description_text), Entries (discussion
+    title and message_text), and Messages (conversation subject and body). The Canvas CanvasObject creates one of
+    these with set_search_index() and every child CanvasObject inherits it, so each of those objects is added as
+    it is built. Objects are written in batches, and an object that is built again replaces its earlier version.
+    HTML is only converted to plain text when the batch is written, so building an object does not convert it.
+
+    Class attributes:
+        columns (tuple[str]): The columns that are returned for each search result (along with the snippet).
+
+    Attributes:
+        batch_size (int): The number of objects that are kept before they are written to the SQLite file.
+        closed (bool): True once close() is used. Objects built earlier can still hold the index (and pass it to
+            their children), so add() does nothing once it is closed.
+        connection (sqlite3.Connection): Connection to the SQLite file.
+        lock (threading.Lock): Protects the connection and the pending rows when objects are built from multiple threads.
+        path (str): Location of the SQLite file. Use ':memory:' for an index that is not saved.
+        pending (list[tuple]): The rows that have not been written yet (with the text still in HTML if it was added as HTML).
+
+    Methods:
+        add(): Adds the text of a CanvasObject
+        clear(): Removes everything from the index
+        close(): Writes the pending rows and closes the SQLite file
+        flush(): Writes the pending rows
+        search(): Searches the index
+    """
+
+    columns = ('type', 'id', 'course_id', 'context_id', 'user_id', 'created_at', 'title', 'text')
+
+    def __init__(self, path: str = 'canvas_search.sqlite', batch_size: int = 500):
+        self.batch_size = batch_size
+        self.closed = False
+        self.lock = threading.Lock()
+        self.path = path
+        self.pending = []
+        self.connection = sqlite3.connect(path, check_same_thread = False)
+        with self.lock, self.connection:
+            # Each object has a row in objects, and its text is stored in documents under the same rowid
+            self.connection.executescript('''
+                CREATE TABLE IF NOT EXISTS objects (rowid INTEGER PRIMARY KEY, type TEXT, id INTEGER, UNIQUE (type, id));
+                CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5(
+                    title, text, type UNINDEXED, id UNINDEXED, course_id UNINDEXED, context_id UNINDEXED,
+                    user_id UNINDEXED, created_at UNINDEXED);
+            ''')
+
+    def __len__(self):
+        self.flush()
+        with self.lock:
+            return self.connection.execute('SELECT COUNT(*) FROM objects').fetchone()[0]
+
+    def __str__(self):
+        return f'SearchIndex: {self.path} \t{len(self)} objects'
+
+    def add(self, canvas_object: 'CanvasObject', title: str, text: str, user_id: int = None, context_id: int = None, # type: ignore
+            course_id: int = None, html: bool = False) -> None:
+        """
+        Adds the text of a CanvasObject. This is called when an Assignment, Entry, or Message is built. Nothing is
+        added once the index is closed.
+
+        Args:
+            canvas_object (CanvasObject): The object being indexed. Its type, id, and created_at are stored.
+            title (str): The title of the object (such as the assignment name or the discussion title).
+            text (str): The text of the object.
+            user_id (int): The author of the object, if there is one.
+            context_id (int): The id of the object that contains it (assignment group, discussion, or conversation).
+            course_id (int): The course of the object. If None, the course_id attribute of the object is used.
+            html (bool): If True, text is HTML and is converted with clean_html() when it is written.
+
+        Returns:
+            None
+        """
+        if course_id == None:
+            course_id = getattr(canvas_object, 'course_id', None)
+        row = (canvas_object.type, canvas_object.id, course_id, context_id, user_id,
+               getattr(canvas_object, 'created_at', None), title, text, html)
+        with self.lock:
+            if self.closed:
+                return
+            self.pending.append(row)
+            if len(self.pending) < self.batch_size:
+                return
+        self.flush()
+
+    def clear(self) -> None:
+        """Removes everything from the index"""
+        with self.lock, self.connection:
+            self.pending = []
+            self.connection.execute('DELETE FROM documents')
+            self.connection.execute('DELETE FROM objects')
+
+    def close(self) -> None:
+        """Writes the pending rows and closes the SQLite file. Anything added afterwards is ignored."""
+        self.flush()
+        with self.lock:
+            self.closed = True
+            self.pending = []
+            self.connection.close()
+
+    def flush(self) -> None:
+        """
+        Writes the pending rows to the SQLite file, converting the HTML text to plain text. Objects that are already
+        in the index are replaced.
+        """
+        with self.lock:
+            if self.closed or len(self.pending) == 0:
+                return
+            rows = {row[:2]: row for row in self.pending}
+            self.pending = []
+            # Only the last version of each object is converted
+            for key, row in rows.items():
+                rows[key] = row[:-2] + (clean_html(row[-2]) if row[-1] else row[-2],)
+            with self.connection:
+                self.connection.executemany('INSERT OR IGNORE INTO objects (type, id) VALUES (?, ?)', rows.keys())
+                self.connection.executemany(
+                    'DELETE FROM documents WHERE rowid = (SELECT rowid FROM objects WHERE type = ? AND id = ?)', rows.keys()
+                )
+                self.connection.executemany(
+                    'INSERT INTO documents (rowid, type, id, course_id, context_id, user_id, created_at, title, text) '
+                    'VALUES ((SELECT rowid FROM objects WHERE type = ?1 AND id = ?2), ?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8)',
+                    rows.values()
+                )
+
+    def search(self, query: str, types: list[str] = None, course_id: int = None, limit: int = 50) -> list[dict]:
+        """
+        Searches the index. Only objects that have already been built (with the index turned on) are found.
+
+        Args:
+            query (str): An FTS5 query. Words must all appear (in any order), "quoted phrases" must appear as written,
+                word* matches any word that starts with word, and OR / NOT / NEAR() can be used.
+            types (list[str]): Only return these types of objects ('Assignment', 'Entry', 'Message').
+            course_id (int): Only return objects from this course.
+            limit (int): The largest number of results.
+
+        Returns:
+            list[dict]: The best matches first. Each has the type, id, course_id, context_id, user_id, created_at,
+                title, and text of the object, and a snippet of the text with the matches in [brackets].
+        """
+        sql = ('SELECT ' + ', '.join(self.columns) + ", snippet(documents, 1, '[', ']', '...', 12) "
+               'FROM documents WHERE documents MATCH ?')
+        params = [query]
+        if types != None:
+            sql += ' AND type IN (' + ', '.join('?' for _ in types) + ')'
+            params += list(types)
+        if course_id != None:
+            sql += ' AND course_id = ?'
+            params.append(course_id)
+        sql += ' ORDER BY rank LIMIT ?'
+        params.append(limit)
+
+        self.flush()
+        with self.lock:
+            rows = self.connection.execute(sql, params).fetchall()
+        return [dict(zip(self.columns + ('snippet',), row)) for row in rows]
@@ -0,0 +1,352 @@
+"""
+Module for the HTTP session shared by every CanvasObject in the canvas_access module.
+
+Classes:
+    AsyncCanvasSession: Wraps an httpx.AsyncClient so that awaitable API calls share a RateLimiter
+    CanvasSession: A requests.Session that paces every API call with a RateLimiter
+    RateLimiter: Paces API calls based on the rate limit headers sent by Canvas
+    RateLimitExceeded: Raised when a request is still throttled after the RateLimiter stops repeating it
+    RetryPolicy: Decides when and how long to wait before repeating a failed request
+"""
+
+import random
+import threading
+import time
+import requests
+
+class RateLimitExceeded(requests.HTTPError):
+    """
+    Raised when a request is still throttled by Canvas (403 Rate Limit Exceeded) after it was repeated
+    RateLimiter.max_retries times. The throttled response is available as the response attribute.
+    """
+
+class RateLimiter:
+    """
+    Paces API calls based on the leaky bucket that Canvas uses to throttle each token. Every response reports
+    how much of the bucket is left (X-Rate-Limit-Remaining) and what the request cost (X-Request-Cost). While
+    there is plenty left, requests are sent immediately. As the bucket gets close to empty, requests are delayed
+    long enough for the bucket to leak back above the low water mark. Between responses, the remaining quota is
+    estimated from how long the bucket has been leaking since the last report, so the delays shrink again as time
+    passes. Requests that are still waiting on a response are counted against the bucket so that parallel jobs
+    slow down together.
+
+    Attributes:
+        capacity (float): The size of the bucket. The remaining quota never leaks above this value.
+        in_flight (int): The number of requests that have been sent but have not received a response.
+        leak_rate (float): Estimate of how many units per second leak out of the bucket.
+        lock (threading.Lock): Protects the bucket information when requests are made from multiple threads.
+        low_water (float): Requests are delayed when the estimated remaining quota falls below this value.
+        max_retries (int): Number of times a throttled request is repeated before the response is returned.
+        max_wait (float): The longest delay (in seconds) before a single request.
+        preflight_cost (float): The units Canvas charges up front for each request in flight.
+        remaining (float): The most recently reported X-Rate-Limit-Remaining.
+        request_cost (float): Running estimate of X-Request-Cost.
+        updated (float): The time (time.monotonic()) when remaining was last reported.
+
+    Methods:
+        acquire(): Waits until the request can be sent
+        acquire_async(): Awaitable version of acquire()
+        is_throttled(): Determines if a response was rejected by the rate limit
+        release(): Reads the rate limit headers from the response and marks the request as finished
+        reserve(): Reserves a spot for a request and returns how long to wait before sending it
+    """
+
+    def __init__(self, low_water: float = 200, leak_rate: float = 10, max_wait: float = 30, max_retries: int = 5):
+        self.capacity = 700
+        self.in_flight = 0
+        self.leak_rate = leak_rate
+        self.lock = threading.Lock()
+        self.low_water = low_water
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self.preflight_cost = 50
+        self.remaining = 700
+        self.request_cost = 0
+        self.updated = time.monotonic()
+
+    def __str__(self):
+        return f'RateLimiter: {self.remaining} remaining \t{self.in_flight} in flight \t{self.request_cost:.1f} per request'
+
+    def acquire(self) -> None:
+        """Waits until the request can be sent"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """Waits until the request can be sent without blocking the event loop"""
+        import asyncio
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def is_throttled(self, response) -> bool:
+        """
+        Determines if a response was rejected by the rate limit. Canvas uses a 403 with a plain text
+        message instead of a 429.
+
+        Args:
+            response (requests.Response): The response from the API.
+
+        Returns:
+            bool: True if the request was throttled
+        """
+        return response.status_code == 403 and 'Rate Limit Exceeded' in response.text
+
+    def release(self, response = None) -> None:
+        """
+        Reads the rate limit headers from the response and marks the request as finished.
+
+        Args:
+            response (requests.Response): The response from the API. If there is no response (such as when
+                the connection fails), the request is only marked as finished.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.in_flight = max(self.in_flight - 1, 0)
+            if response == None:
+                return
+            if 'X-Rate-Limit-Remaining' in response.headers:
+                self.remaining = float(response.headers['X-Rate-Limit-Remaining'])
+                self.updated = time.monotonic()
+            if 'X-Request-Cost' in response.headers:
+                cost = float(response.headers['X-Request-Cost'])
+                self.request_cost = cost if self.request_cost == 0 else 0.8 * self.request_cost + 0.2 * cost
+            if self.is_throttled(response):
+                self.remaining = 0
+                self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """
+        Reserves a spot for a request and returns how long to wait before sending it.
+
+        Returns:
+            float: The number of seconds to wait.
+        """
+        with self.lock:
+            remaining = min(self.remaining + (time.monotonic() - self.updated) * self.leak_rate, self.capacity)
+            estimate = remaining - self.in_flight * (self.request_cost + self.preflight_cost)
+            self.in_flight += 1
+        if estimate >= self.low_water:
+            return 0
+        return min((self.low_water - estimate) / self.leak_rate, self.max_wait)
+
+class RetryPolicy:
+    """
+    Decides when and how long to wait before repeating a request that failed for a reason that is likely to go
+    away on its own, such as a 502 or a dropped connection. Only idempotent methods are repeated. The wait grows
+    exponentially with each attempt and is randomized (full jitter) so parallel jobs do not retry in lockstep.
+    If the response has a Retry-After header, that wait is used instead. When the repeats run out on one of the
+    statuses, the session raises an HTTPError instead of returning the error response.
+
+    Attributes:
+        backoff (float): The base wait (in seconds) before the first repeat.
+        max_backoff (float): The longest wait (in seconds) before a single repeat.
+        max_retries (int): The number of times a request is repeated before giving up. Use 0 to turn off retries.
+        methods (set[str]): The HTTP methods that are safe to repeat.
+        statuses (set[int]): The HTTP status codes that are repeated.
+
+    Methods:
+        delay(): Determines how long to wait before the next attempt
+        should_retry(): Determines if a request should be repeated
+    """
+
+    def __init__(self, max_retries: int = 5, backoff: float = 0.5, max_backoff: float = 60,
+                 statuses: set[int] = {429, 500, 502, 503, 504}, methods: set[str] = {'GET', 'HEAD', 'OPTIONS'}):
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retries = max_retries
+        self.methods = methods
+        self.statuses = statuses
+
+    def __str__(self):
+        return f'RetryPolicy: {self.max_retries} retries \t{self.backoff}s to {self.max_backoff}s backoff \t{sorted(self.statuses)}'
+
+    def delay(self, attempt: int, response = None) -> float:
+        """
+        Determines how long to wait before the next attempt.
+
+        Args:
+            attempt (int): The number of repeats that have already been made.
+            response (requests.Response): The failed response, if there was one.
+
+        Returns:
+            float: The number of seconds to wait.
+        """
+        if response != None and 'Retry-After' in response.headers:
+            retry_after = response.headers['Retry-After']
+            try:
+                return min(max(float(retry_after), 0), self.max_backoff)
+            except ValueError:
+                from datetime import datetime, timezone
+                from email.utils import parsedate_to_datetime
+                try:
+                    wait = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+                    return min(max(wait, 0), self.max_backoff)
+                except (TypeError, ValueError):
+                    pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def should_retry(self, method: str, attempt: int, response = None) -> bool:
+        """
+        Determines if a request should be repeated.
+
+        Args:
+            method (str): The HTTP method of the request.
+            attempt (int): The number of repeats that have already been made.
+            response (requests.Response): The response, or None if the connection failed.
+
+        Returns:
+            bool: True if the request should be repeated
+        """
+        if attempt >= self.max_retries or method.upper() not in self.methods:
+            return False
+        if response == None:
+            return True
+        return response.status_code in self.statuses
+
+class AsyncCanvasSession:
+    """
+    Wraps an httpx.AsyncClient so that awaitable API calls share a RateLimiter and RetryPolicy with the blocking
+    CanvasSession. Requests that are throttled by Canvas are repeated after waiting instead of being returned as data.
+
+    Attributes:
+        client (httpx.AsyncClient): The client used to send the requests.
+        rate_limiter (RateLimiter): The limiter shared by every request made with the session.
+        retry_policy (RetryPolicy): Decides when failed requests are repeated.
+
+    Methods:
+        aclose(): Closes the client
+        get(): Sends a GET request once the rate limiter allows it
+    """
+
+    def __init__(self, client: 'httpx.AsyncClient', rate_limiter: RateLimiter, retry_policy: RetryPolicy = None): # type: ignore
+        self.client = client
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy if retry_policy != None else RetryPolicy()
+
+    async def aclose(self) -> None:
+        """Closes the client"""
+        await self.client.aclose()
+
+    async def get(self, url, **kwargs) -> 'httpx.Response': # type: ignore
+        """
+        Sends a GET request once the rate limiter allows it. Throttled and failed requests are repeated. A request
+        that is still throttled after RateLimiter.max_retries repeats raises RateLimitExceeded.
+        """
+        import asyncio
+        import httpx
+        attempt = 0
+        throttled = 0
+        while True:
+            await self.rate_limiter.acquire_async()
+            response = None
+            error = None
+            try:
+                response = await self.client.get(url, **kwargs)
+            except httpx.TransportError as exception:
+                error = exception
+            finally:
+                self.rate_limiter.release(response)
+
+            if response != None and self.rate_limiter.is_throttled(response):
+                if throttled >= self.rate_limiter.max_retries:
+                    raise RateLimitExceeded(f'Rate Limit Exceeded after {throttled} retries: {url}', response = response)
+                throttled += 1
+                continue
+            if not self.retry_policy.should_retry('GET', attempt, response):
+                if error != None:
+                    raise error
+                if response.status_code in self.retry_policy.statuses:
+                    # The retries ran out (or the method is not safe to repeat), so the error is not returned as data
+                    response.raise_for_status()
+                return response
+            await asyncio.sleep(self.retry_policy.delay(attempt, response))
+            attempt += 1
+
+class CanvasSession(requests.Session):
+    """
+    A requests.Session that paces every API call with a RateLimiter. The Canvas CanvasObject creates one of these
+    and every child CanvasObject inherits it, so all of the objects from one Canvas share the same limiter.
+    Requests that are throttled by Canvas are repeated after waiting instead of being returned as data, and
+    requests that fail for transient reasons (such as a 502 or a dropped connection) are repeated according to
+    the RetryPolicy. If a request still fails with one of the RetryPolicy statuses, an HTTPError is raised
+    instead of returning the error response. If a ResponseCache is attached, GET requests are revalidated against the stored responses.
+    If a Snapshot is attached as the recorder, every successful GET response is also recorded into it.
+
+    Attributes:
+        cache (ResponseCache): Optional on-disk cache for GET responses. None if responses are not cached.
+        rate_limiter (RateLimiter): The limiter shared by every request made with the session.
+        recorder (Snapshot): Optional Snapshot that successful GET responses are recorded into (see Course.snapshot()).
+            None if responses are not recorded.
+        retry_policy (RetryPolicy): Decides when failed requests are repeated.
+
+    Methods:
+        paced_request(): Sends a request once the rate limiter allows it, repeating it if needed
+        request(): Sends a request, using the cache when possible
+    """
+
+    def __init__(self, rate_limiter: RateLimiter = None, retry_policy: RetryPolicy = None):
+        super().__init__()
+        self.cache = None
+        self.rate_limiter = rate_limiter if rate_limiter != None else RateLimiter()
+        self.recorder = None
+        self.retry_policy = retry_policy if retry_policy != None else RetryPolicy()
+
+    def request(self, method, url, *args, **kwargs) -> requests.Response:
+        """
+        Sends a request. If there is a cache, a stored GET response is revalidated with a conditional request
+        and returned if Canvas reports that it has not been modified. If there is a recorder, the GET response
+        is recorded.
+        """
+        if self.cache == None or method.upper() != 'GET':
+            response = self.paced_request(method, url, *args, **kwargs)
+        else:
+            key = self.cache.key(url, kwargs.get('params'), kwargs.get('headers'))
+            entry = self.cache.get(key)
+            if entry != None:
+                kwargs['headers'] = dict(kwargs.get('headers') or {}) | self.cache.conditional_headers(entry)
+            response = self.paced_request(method, url, *args, **kwargs)
+            if response.status_code == 304 and entry != None:
+                response = self.cache.to_response(entry, response)
+            elif response.status_code == 200:
+                self.cache.store(key, response)
+
+        if self.recorder != None and method.upper() == 'GET' and response.status_code == 200:
+            self.recorder.store(self.recorder.key(url, kwargs.get('params')), response)
+        return response
+
+    def paced_request(self, method, url, *args, **kwargs) -> requests.Response:
+        """
+        Sends a request once the rate limiter allows it. Throttled and failed requests are repeated. A request
+        that is still throttled after RateLimiter.max_retries repeats raises RateLimitExceeded.
+        """
+        attempt = 0
+        throttled = 0
+        while True:
+            self.rate_limiter.acquire()
+            response = None
+            error = None
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as exception:
+                error = exception
+            finally:
+                self.rate_limiter.release(response)
+
+            if response != None and self.rate_limiter.is_throttled(response):
+                if throttled >= self.rate_limiter.max_retries:
+                    raise RateLimitExceeded(f'Rate Limit Exceeded after {throttled} retries: {url}', response = response)
+                throttled += 1
+                continue
+            if not self.retry_policy.should_retry(method, attempt, response):
+                if error != None:
+                    raise error
+                if response.status_code in self.retry_policy.statuses:
+                    # The retries ran out (or the method is not safe to repeat), so the error is not returned as data
+                    response.raise_for_status()
+                return response
+            time.sleep(self.retry_policy.delay(attempt, response))
+            attempt += 1
@@ -0,0 +1,140 @@
+"""
+Module for offline snapshots of Canvas API responses for the canvas_access module.
+
+Classes:
+    Snapshot: Stores recorded API responses in SQLite, indexed by the full request URL
+    SnapshotSession: A CanvasSession that answers GET requests from a Snapshot instead of the API
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import requests
+from canvas_access.session import CanvasSession
+
+class Snapshot:
+    """
+    Stores the body and headers of every successful GET response made while it is attached to a CanvasSession
+    (see Course.snapshot()). Responses are indexed by the full URL (including the parameters) but not by the API
+    key, so the snapshot can be opened later without a key (see Canvas.from_snapshot()). Several courses can be
+    recorded into the same file.
+
+    Attributes:
+        base_api_url (str): The base API URL of the Canvas instance that was recorded.
+        connection (sqlite3.Connection): Connection to the SQLite file.
+        lock (threading.Lock): Protects the connection when requests are made from multiple threads.
+        path (str): Location of the SQLite file.
+
+    Methods:
+        close(): Closes the SQLite file
+        get(): Gets a recorded response
+        key(): Creates the key for a request
+        store(): Records a response
+    """
+
+    def __init__(self, path: str = 'canvas_snapshot.sqlite', base_api_url: str = None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread = False)
+        with self.lock, self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, headers TEXT, body BLOB, stored_at REAL)'
+            )
+            self.connection.execute('CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT)')
+            if base_api_url != None:
+                self.connection.execute('INSERT OR REPLACE INTO metadata VALUES (?, ?)', ('base_api_url', base_api_url))
+            row = self.connection.execute("SELECT value FROM metadata WHERE key = 'base_api_url'").fetchone()
+        self.base_api_url = row[0] if row != None else None
+
+    def __str__(self):
+        with self.lock:
+            count = self.connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        return f'Snapshot: {self.path} \t{self.base_api_url} \t{count} responses'
+
+    def close(self) -> None:
+        """Closes the SQLite file"""
+        with self.lock:
+            self.connection.close()
+
+    def get(self, key: str) -> requests.Response:
+        """
+        Gets a recorded response.
+
+        Args:
+            key (str): The key from key().
+
+        Returns:
+            requests.Response: A 200 response with the recorded headers and body. None if nothing was recorded.
+        """
+        with self.lock:
+            row = self.connection.execute('SELECT headers, body FROM responses WHERE url = ?', (key,)).fetchone()
+        if row == None:
+            return None
+        response = requests.Response()
+        response.status_code = 200
+        response.headers.update(json.loads(row[0]))
+        response._content = row[1]
+        response.encoding = 'utf-8'
+        response.url = key
+        response.from_cache = True
+        return response
+
+    def key(self, url: str, params: dict = None) -> str:
+        """
+        Creates the key for a request from the full URL (including parameters).
+
+        Args:
+            url (str): The URL of the request.
+            params (dict): Any parameters that will be sent with the request.
+
+        Returns:
+            str: The key.
+        """
+        return requests.Request('GET', url, params = params).prepare().url
+
+    def store(self, key: str, response: requests.Response) -> None:
+        """
+        Records a response. The rate limit headers are not kept since they only describe the original session.
+
+        Args:
+            key (str): The key from key().
+            response (requests.Response): A successful response.
+
+        Returns:
+            None
+        """
+        headers = {header: value for header, value in response.headers.items() if not header.lower().startswith('x-rate-limit')}
+        with self.lock, self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+                (key, json.dumps(headers), response.content, time.time())
+            )
+
+class SnapshotSession(CanvasSession):
+    """
+    A CanvasSession that answers GET requests from a Snapshot instead of the API, so the same get_* methods can be
+    used offline. No API quota is used and nothing is sent over the network.
+
+    Attributes:
+        CanvasSession attributes: See CanvasSession
+        snapshot (Snapshot): The recorded responses.
+
+    Methods:
+        request(): Gets the recorded response for a GET request
+    """
+
+    def __init__(self, snapshot: Snapshot, rate_limiter = None, retry_policy = None):
+        super().__init__(rate_limiter, retry_policy)
+        self.snapshot = snapshot
+
+    def request(self, method, url, *args, **kwargs) -> requests.Response:
+        """
+        Gets the recorded response for a GET request. Requests that were not recorded (and any request that would
+        change data on Canvas) raise a KeyError instead of reaching the API.
+        """
+        key = self.snapshot.key(url, kwargs.get('params'))
+        response = self.snapshot.get(key) if method.upper() == 'GET' else None
+        if response == None:
+            raise KeyError(f'{method.upper()} {key} is not in the snapshot {self.snapshot.path}')
+        return response
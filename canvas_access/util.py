@@ -1,200 +1,330 @@
-"""
-Module that contains useful functions used throughout the canvas_access module
-
-Functions:
-    clean_html(): Converts an HTML string to plain text
-    dt_to_local_str(): Convert a Z-time datetime object into a local time string
-    GET_list(): GET data using an API call, working through the pagination
-    list_to_dict(): Converts a list from the API into a dictionary
-    parse_nagivation_links(): Gets the navigation links from the header of the API response
-    print_dict(): Prints the CanvasObjects in a dictionary (sorted by id or by the order sent by the API)
-    z_time_str_test(): Determines if a string is a Z-time. [There is probably a better way to do this?]
-    z_time_str_to_dt(): Convert a Z-time string to a datetime object
-"""
-
-from datetime import datetime 
-from typing import TypeVar, Type
-
-T = TypeVar('T')
-
-def clean_html(html_string: str) -> str:
-    """
-    Converts HTML to plain text.
-    
-    Args:
-        html_string (str): The string containing HTML to be converted
-    
-    Returns:
-        string: The plain text version of the HTML content.
-    """
-    if html_string == None:
-        return None
-
-    import re
-
-    def strip_html_regex(html_string):
-        clean = re.compile('<.*?>')
-        return re.sub(clean, '', html_string)
-    
-    html_string = html_string.replace('<br>', 'NEWLINE')
-    html_string = html_string.replace('</p>', 'NEWLINE</p>')
-    html_string = html_string.replace('<img', ' IMAGE <img')
-
-    plain_text = strip_html_regex(html_string)
-    plain_text = plain_text.replace('NEWLINE', '\n')
-
-    return plain_text
-
-def dt_to_local_str(dt: datetime, tz = 'pytz.timezone') -> str:
-    """
-    Convert a datetime object into a local time string.
-    
-    Args:
-        dt (datetime): The datetime object being converted to a string.
-        tz (pytz.timezone): The local timezone. This is typically the tz attribute
-            of the object. This is set at the Canvas CanvasObject level. 
-    
-    Returns:
-        str: The local time string of the original datetime object.
-    """
-    return dt.astimezone(tz).strftime("%Y-%m-%d %H:%M:%S")
-
-def GET_list(session: 'requests.session.Session', headers: dict, first_url: str, params: dict = {} ) -> list[dict]: # type: ignore
-    """
-    Gets all the data from the API call, working through all the pagination
-    
-    Args:
-        session (requests.session.Session): The session used for the API call.
-        headers (dict): Typically contains just API_KEY.
-        first_url (str): URL for the first page of the contents. This is typically the API endpoint.
-        params (dict): Any parameters that will be sent with the request.
-    """
-    this_list = []
-    url = first_url
-    while True:
-        response = session.get(url, headers = headers, params = params)
-        this_list += response.json()
-
-        if 'link' in response.headers.keys():
-            first_link, current_link, next_link, last_link = parse_navigation_links(response.headers['link'].split(','))
-
-            if current_link == last_link:
-                break
-            url = next_link
-        else:
-            break
-    return this_list
-
-def list_to_dict(parentCanvasObject: 'CanvasObject', Class: Type[T], object_list: list[dict]) -> dict['CanvasObject']: # type: ignore
-    """
-    Converts a list of dictionary objects from the API into a dictionary of CanvasObjects.
-    
-    Args:
-        ParentCanvasObject[CanvasObject]: The CanvasObject that is making the API call. This
-            will be important for inheritance.
-        Class (CanvasObject class): The output CanvasObject class.
-        object_list (list[dict]): A list of dictionaries from the API that represents the data
-            that needs to be converted into CanvasObjects.
-    """
-    canvasObject_dict = {}
-    for object in object_list:
-        canvasObject_dict[object['id']] = Class(parentCanvasObject, object)
-    return canvasObject_dict
-
-def parse_navigation_links(link_list: list[str]) -> tuple[str, str, str, str]:
-    """
-    Parses the json header to get the navigation links
-    
-    Args:
-        link_list (list[str]): The data from the 'link' key in the header from the API.
-
-    Returns:
-        tuple[str, str, str, str]: Four URLs corresponding to the four keys.
-            - first, current, next, last
-
-    """
-    first_link = ''
-    current_link = ''
-    next_link = ''
-    last_link = ''
-    for link_info in link_list:
-        if 'rel="first"' in link_info:
-            first_link = link_info.split(';')[0].strip('<>')
-        if 'rel="current"' in link_info:
-            current_link = link_info.split(';')[0].strip('<>')
-        if 'rel="next"' in link_info:
-            next_link = link_info.split(';')[0].strip('<>')
-        if 'rel="last"' in link_info:
-            last_link = link_info.split(';')[0].strip('<>')
-    return first_link, current_link, next_link, last_link
-
-def print_dict(canvasObject_dict: dict['CanvasObject'], sort: str = 'id_desc') -> None: # type: ignore
-    """
-    Print the CanvasObjects in a dictionary.
-    
-    Args:
-        canvasObject_dict (dict[CanvasObject]): Dictionary of CanvasObjects, typically
-            obtained from a get_Class() method.
-        sort (str): Sort method. The default is to print in decreasing order by id, which
-            normally causes the newest objects to be on top.
-            -- 'id_asc': Sort ascending by CanvasObject ID.
-            -- 'natural': Use the natural order provided by the dictionary
-            -- TODO: 'custom_<name>': Custom ordering using the CanvasObject attribute <name>
-            -- Any other string will result in the default sort.
-    
-    Returns:
-        None
-    """
-    if sort == 'id_asc':
-        print_order = sorted(canvasObject_dict.keys(), reverse = False)
-    elif sort == 'natural':
-        print_order = canvasObject_dict.keys()
-    elif sort[:7] == 'custom_':
-        sort_attribute = sort[7:]
-        attribute_found = 0
-        for object_id, object in canvasObject_dict.items():
-            if sort_attribute in object.__dict__.keys():
-                attribute_found += 1
-        if attribute_found == len(canvasObject_dict):
-            print_order = sorted(canvasObject_dict.items(), key=lambda item: item[1].__dict__[sort_attribute])
-        else:
-            print_order = sorted(canvasObject_dict.keys(), reverse = True)
-    else:
-        print_order = sorted(canvasObject_dict.keys(), reverse = True)
-
-    for object_id in print_order:
-        print(canvasObject_dict[object_id])
-
-def z_time_str_test(test_str: str) -> bool:
-    """
-    Determine if a string is a Z-time string.
-
-    Args:
-        test_str (str): The string to be tested as a z-time string.
-            - Z-time format: YYYY-MM-DDTHH:MM:SSZ
-            - ISO format of z-time: YYYY-MM-DDTHH:MM:SS+00:00
-
-    Returns:
-        bool:
-            - True if datetime object is successfully created
-            - False if datetime object is not successfully created
-    """
-    try:
-        datetime.fromisoformat(test_str.replace('Z', '+00:00'))
-        return True
-    
-    except:
-        return False
-
-def z_time_str_to_dt(z_time_str: str) -> datetime:
-    """
-    Convert a Z-time string to a datetime object.
-    
-    Args:
-        z_time_str: A Z-time string. Note that this does not error-check, so 
-            z_time_str_test() should be run on the string before this happens.
-    
-    Returns:
-        datetime: A datetime object matching the Z-time.
-    """
-    return datetime.fromisoformat(z_time_str.replace('Z', '+00:00'))
\ No newline at end of file
+"""
+Module that contains useful functions used throughout the canvas_access module
+
+Functions:
+    clean_html(): Converts an HTML string to plain text
+    dt_to_local_str(): Convert a Z-time datetime object into a local time string
+    GET_iter(): GET data using an API call, yielding the items one page at a time
+    GET_list(): GET data using an API call, working through the pagination
+    GET_list_async(): Awaitable version of GET_list() for an httpx.AsyncClient
+    list_to_dict(): Converts a list from the API into a dictionary
+    page_range(): Builds the URLs for all of the pages between two numbered navigation links
+    parse_nagivation_links(): Gets the navigation links from the header of the API response
+    print_dict(): Prints the CanvasObjects in a dictionary (sorted by id or by the order sent by the API)
+    z_time_str_parse(): Converts a value to a datetime object if it is a Z-time string
+    z_time_str_test(): Determines if a string is a Z-time.
+    z_time_str_to_dt(): Convert a Z-time string to a datetime object
+"""
+
+import html
+import re
+from datetime import datetime 
+from typing import Iterator, TypeVar, Type
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+T = TypeVar('T')
+
+# HTML comments and every tag that is removed without leaving any text
+HTML_DROPPED_TAG = re.compile(r'<!--.*?-->|<(?!br\b|/p\s*>|img\b)[^>]*>', re.DOTALL | re.IGNORECASE)
+# The tags that are replaced by text
+HTML_TEXT_TAGS = (
+    (re.compile(r'<br\b[^>]*>', re.IGNORECASE), '\n'),
+    (re.compile(r'</p\s*>', re.IGNORECASE), '\n'),
+    (re.compile(r'<img\b[^>]*>', re.IGNORECASE), ' IMAGE ')
+)
+
+def clean_html(html_string: str) -> str:
+    """
+    Converts HTML to plain text with precompiled patterns. Line breaks and the ends of paragraphs become newlines,
+    images become ' IMAGE ', and all other tags and comments are removed. Entities (such as &amp; and &nbsp;) are
+    then decoded. The tags that are only removed are handled in one pass, so the other patterns usually only
+    have a few tags left to replace.
+    
+    Args:
+        html_string (str): The string containing HTML to be converted
+    
+    Returns:
+        string: The plain text version of the HTML content.
+    """
+    if html_string == None:
+        return None
+
+    plain_text = HTML_DROPPED_TAG.sub('', html_string)
+    if '<' in plain_text:
+        for pattern, text in HTML_TEXT_TAGS:
+            plain_text = pattern.sub(text, plain_text)
+    if '&' in plain_text:
+        plain_text = html.unescape(plain_text)
+    return plain_text
+
+def dt_to_local_str(dt: datetime, tz = 'pytz.timezone') -> str:
+    """
+    Convert a datetime object into a local time string.
+    
+    Args:
+        dt (datetime): The datetime object being converted to a string.
+        tz (pytz.timezone): The local timezone. This is typically the tz attribute
+            of the object. This is set at the Canvas CanvasObject level. 
+    
+    Returns:
+        str: The local time string of the original datetime object.
+    """
+    return dt.astimezone(tz).strftime("%Y-%m-%d %H:%M:%S")
+
+def GET_iter(session: 'requests.session.Session', headers: dict, first_url: str, params: dict = {}) -> Iterator[dict]: # type: ignore
+    """
+    Yields the data from the API call one page at a time, so that the caller can start working before
+    the last page arrives and only one page is held in memory at a time.
+    
+    Args:
+        session (requests.session.Session): The session used for the API call.
+        headers (dict): Typically contains just API_KEY.
+        first_url (str): URL for the first page of the contents. This is typically the API endpoint.
+        params (dict): Any parameters that will be sent with the request.
+    """
+    url = first_url
+    while True:
+        response = session.get(url, headers = headers, params = params)
+        yield from response.json()
+
+        if 'link' in response.headers.keys():
+            first_link, current_link, next_link, last_link = parse_navigation_links(response.headers['link'].split(','))
+
+            if current_link == last_link or next_link == '':
+                break
+            url = next_link
+        else:
+            break
+
+def GET_list(session: 'requests.session.Session', headers: dict, first_url: str, params: dict = {}, workers: int = 4) -> list[dict]: # type: ignore
+    """
+    Gets all the data from the API call, working through all the pagination. If the navigation links give
+    numbered pages up to the last page, the remaining pages are requested at the same time and put back in order.
+    Otherwise, the next links are followed one at a time.
+    
+    Args:
+        session (requests.session.Session): The session used for the API call.
+        headers (dict): Typically contains just API_KEY.
+        first_url (str): URL for the first page of the contents. This is typically the API endpoint.
+        params (dict): Any parameters that will be sent with the request.
+        workers (int): The maximum number of pages requested at the same time. Use 1 to request pages one at a time.
+    """
+    def get_page(url):
+        return session.get(url, headers = headers, params = params).json()
+
+    this_list = []
+    url = first_url
+    while True:
+        response = session.get(url, headers = headers, params = params)
+        this_list += response.json()
+
+        if 'link' in response.headers.keys():
+            first_link, current_link, next_link, last_link = parse_navigation_links(response.headers['link'].split(','))
+
+            if current_link == last_link or next_link == '':
+                break
+
+            page_urls = page_range(next_link, last_link)
+            if workers > 1 and len(page_urls) > 1:
+                from concurrent.futures import ThreadPoolExecutor
+                with ThreadPoolExecutor(max_workers = min(workers, len(page_urls))) as executor:
+                    for page in executor.map(get_page, page_urls):
+                        this_list += page
+                break
+            url = next_link
+        else:
+            break
+    return this_list
+
+async def GET_list_async(client: 'AsyncCanvasSession', headers: dict, first_url: str, params: dict = {} ) -> list[dict]: # type: ignore
+    """
+    Gets all the data from the API call, working through all the pagination, without blocking the event loop.
+    
+    Args:
+        client (AsyncCanvasSession): The async session (or httpx.AsyncClient) used for the API call.
+        headers (dict): Typically contains just API_KEY.
+        first_url (str): URL for the first page of the contents. This is typically the API endpoint.
+        params (dict): Any parameters that will be sent with the request.
+    """
+    this_list = []
+    url = first_url
+    while True:
+        # httpx replaces the query string of the URL whenever params is given, so only send params when there are some
+        response = await client.get(url, headers = headers, params = params or None)
+        this_list += response.json()
+
+        if 'link' in response.headers.keys():
+            first_link, current_link, next_link, last_link = parse_navigation_links(response.headers['link'].split(','))
+
+            if current_link == last_link or next_link == '':
+                break
+            # The navigation links already contain the parameters
+            url = next_link
+            params = None
+        else:
+            break
+    return this_list
+
+def list_to_dict(parentCanvasObject: 'CanvasObject', Class: Type[T], object_list: list[dict]) -> dict['CanvasObject']: # type: ignore
+    """
+    Converts a list of dictionary objects from the API into a dictionary of CanvasObjects. The CanvasObjects are
+    added to the identity map (if there is one) so that later lookups of the same object can reuse them.
+    
+    Args:
+        ParentCanvasObject[CanvasObject]: The CanvasObject that is making the API call. This
+            will be important for inheritance.
+        Class (CanvasObject class): The output CanvasObject class.
+        object_list (list[dict]): A list of dictionaries from the API that represents the data
+            that needs to be converted into CanvasObjects.
+    """
+    identity_map = parentCanvasObject.__dict__.get('identity_map')
+    canvasObject_dict = {}
+    for object in object_list:
+        canvasObject_dict[object['id']] = Class(parentCanvasObject, object)
+        if identity_map != None:
+            identity_map.add(canvasObject_dict[object['id']])
+    return canvasObject_dict
+
+def page_range(next_link: str, last_link: str) -> list[str]:
+    """
+    Builds the URLs for every page from next_link to last_link when both links use numbered pages.
+    
+    Args:
+        next_link (str): The 'next' navigation link.
+        last_link (str): The 'last' navigation link.
+
+    Returns:
+        list[str]: The URLs of the pages in order. The list is empty if the pages are not numbered (such as
+            Canvas bookmark pages) or if the two links do not otherwise match.
+    """
+    next_parts = urlsplit(next_link)
+    last_parts = urlsplit(last_link)
+    next_query = parse_qsl(next_parts.query, keep_blank_values = True)
+    last_query = parse_qsl(last_parts.query, keep_blank_values = True)
+    next_page = dict(next_query).get('page', '')
+    last_page = dict(last_query).get('page', '')
+    if not (next_page.isdigit() and last_page.isdigit()):
+        return []
+    if next_parts.path != last_parts.path or \
+        [item for item in next_query if item[0] != 'page'] != [item for item in last_query if item[0] != 'page']:
+        return []
+
+    page_urls = []
+    for page in range(int(next_page), int(last_page) + 1):
+        query = urlencode([(key, str(page) if key == 'page' else value) for key, value in next_query])
+        page_urls.append(urlunsplit(next_parts._replace(query = query)))
+    return page_urls
+
+def parse_navigation_links(link_list: list[str]) -> tuple[str, str, str, str]:
+    """
+    Parses the json header to get the navigation links
+    
+    Args:
+        link_list (list[str]): The data from the 'link' key in the header from the API.
+
+    Returns:
+        tuple[str, str, str, str]: Four URLs corresponding to the four keys.
+            - first, current, next, last
+
+    """
+    first_link = ''
+    current_link = ''
+    next_link = ''
+    last_link = ''
+    for link_info in link_list:
+        if 'rel="first"' in link_info:
+            first_link = link_info.split(';')[0].strip('<>')
+        if 'rel="current"' in link_info:
+            current_link = link_info.split(';')[0].strip('<>')
+        if 'rel="next"' in link_info:
+            next_link = link_info.split(';')[0].strip('<>')
+        if 'rel="last"' in link_info:
+            last_link = link_info.split(';')[0].strip('<>')
+    return first_link, current_link, next_link, last_link
+
+def print_dict(canvasObject_dict: dict['CanvasObject'], sort: str = 'id_desc') -> None: # type: ignore
+    """
+    Print the CanvasObjects in a dictionary.
+    
+    Args:
+        canvasObject_dict (dict[CanvasObject]): Dictionary of CanvasObjects, typically
+            obtained from a get_Class() method.
+        sort (str): Sort method. The default is to print in decreasing order by id, which
+            normally causes the newest objects to be on top.
+            -- 'id_asc': Sort ascending by CanvasObject ID.
+            -- 'natural': Use the natural order provided by the dictionary
+            -- TODO: 'custom_<name>': Custom ordering using the CanvasObject attribute <name>
+            -- Any other string will result in the default sort.
+    
+    Returns:
+        None
+    """
+    if sort == 'id_asc':
+        print_order = sorted(canvasObject_dict.keys(), reverse = False)
+    elif sort == 'natural':
+        print_order = canvasObject_dict.keys()
+    elif sort[:7] == 'custom_':
+        sort_attribute = sort[7:]
+        attribute_found = 0
+        for object_id, object in canvasObject_dict.items():
+            if hasattr(object, sort_attribute):
+                attribute_found += 1
+        if attribute_found == len(canvasObject_dict):
+            print_order = sorted(canvasObject_dict.keys(), key=lambda object_id: getattr(canvasObject_dict[object_id], sort_attribute))
+        else:
+            print_order = sorted(canvasObject_dict.keys(), reverse = True)
+    else:
+        print_order = sorted(canvasObject_dict.keys(), reverse = True)
+
+    for object_id in print_order:
+        print(canvasObject_dict[object_id])
+
+def z_time_str_parse(test_str: str) -> datetime:
+    """
+    Converts a value to a datetime object if it is a Z-time string. The type and shape of the value are checked
+    before parsing, so values that are clearly not times (numbers, None, lists, ordinary text) are rejected
+    without the cost of a failed parse.
+
+    Args:
+        test_str (str): The value to be converted.
+            - Z-time format: YYYY-MM-DDTHH:MM:SSZ
+            - ISO format of z-time: YYYY-MM-DDTHH:MM:SS+00:00
+
+    Returns:
+        datetime: The datetime object matching the Z-time, or None if the value is not a Z-time string.
+    """
+    if type(test_str) != str or len(test_str) < 10 or test_str[4] != '-' or test_str[7] != '-':
+        return None
+    try:
+        return datetime.fromisoformat(test_str)
+    except ValueError:
+        return None
+
+def z_time_str_test(test_str: str) -> bool:
+    """
+    Determine if a string is a Z-time string.
+
+    Args:
+        test_str (str): The string to be tested as a z-time string.
+            - Z-time format: YYYY-MM-DDTHH:MM:SSZ
+            - ISO format of z-time: YYYY-MM-DDTHH:MM:SS+00:00
+
+    Returns:
+        bool:
+            - True if datetime object is successfully created
+            - False if datetime object is not successfully created
+    """
+    return z_time_str_parse(test_str) != None
+
+def z_time_str_to_dt(z_time_str: str) -> datetime:
+    """
+    Convert a Z-time string to a datetime object.
+    
+    Args:
+        z_time_str: A Z-time string. Note that this does not error-check, so 
+            z_time_str_test() should be run on the string before this happens.
+    
+    Returns:
+        datetime: A datetime object matching the Z-time.
+    """
+    return datetime.fromisoformat(z_time_str)
\ No newline at end of file
@@ -1,93 +1,710 @@
-"""
-Grade_bundle classes for use with canvas_access.
-
-Classes:
-    AssignmentCluster: A class containing a list of assignments that are clustered together plus additional data.
-    GradingBundle: A class of StudentPortfolios plus additional data.
-    StudentPortfolio: A class of submissions from a single student plus additional data.
-"""
-
-import pandas as pd
-
-from canvas_access.assignment import Assignment
-from canvas_access.course import Course
-from canvas_access.user import User
-from canvas_access.util import GET_list, list_to_dict
-
-class AssignmentCluster:
-    """
-    A collection of assignments that are grouped together for some reason, such as assignment groups or other types of related assignments.
-
-    Attributes:
-        assignment_ids (list[int]): A list of assignment_ids to be included in the cluster.
-        name (str): The name of the assignment cluster.
-        weight (float): The amount of weight of the cluster. This value is used with the weight_clusters() function.
-    """
-    def __init__(self, name: str, assignment_ids: list[int], weight: float = None):
-        self.name = name
-        self.assignment_ids = assignment_ids
-        self.weight = weight
-
-    def __str__(self):
-        return f'{self.name}\t{self.weight}\t{self.assignment_ids}'
-
-class GradingBundle:
-    """
-    A collection of StudentPortfolios plus additional data.
-
-    Attributes:
-        assignment_ids (list(int)): The list of assignment_ids.
-        assignment (dict(Assignment)): A dictionary of assignments for the course indexed by assignment_id.
-        portfolios (dict(StudentPortfolio)): A dictionary of student portfolios indexed by student_id.
-        student_ids (list(int)): A list of student_ids.
-        students (dict[User]): A dictionary of students for the bundle indexed by student_id
-        type (str): Type of object for display in __str__.
-    
-    Methods:
-        None
-    """
-    def __init__(self, course: 'Course', assignments: 'dict[Assignment]', students: 'dict[User]'): # type: ignore
-        self.assignment_ids = list(assignments.keys())
-        self.assignments = assignments
-        self.portfolios = {}
-        self.student_ids = list(students.keys())
-        self.students = students
-        self.type = 'GradingBundle'
-
-        # Load the student submission data
-        student_count = 0
-        for student_id, student in students.items():
-            student_count += 1
-            print(f'Getting submissions for student {student_count} of {len(self.student_ids)} ({student.name})')
-            self.portfolios[student_id] = StudentPortfolio(course, student, assignments)
-
-class StudentPortfolio:
-    """
-    Student portfolio of work and data.
-
-    Attributes:
-        course_id (int): Course ID of the course.
-        id (int): User ID for the student.
-        submissions (dict[Submission]): A dictionary of submissions indexed by assignment_id.
-        type (str): Type of object for display in __str__.
-    
-    Methods:
-        None
-    """
-    def __init__(self, course: Course, user: User, assignments: dict[Assignment]):
-        self.course_id = course.id
-        self.course_name = course.name
-        self.student_id = user.id
-        self.student_name = user.name
-        self.student_NSHE = user.sis_user_id
-        self.type = 'StudentPortfolio'
-
-        submissions = user.get_submissions(course.id)
-        self.submissions = {
-            submission.assignment_id: submission for _, submission in submissions.items()
-        }
-        for assignment_id, assignment in assignments.items():
-            self.submissions[assignment_id].add_assignment_info(assignment)
-    
-    def __str__(self):
+"""
+Grade_bundle classes for use with canvas_access.
+
+Classes:
+    AssignmentCluster: A class containing a list of assignments that are clustered together plus additional data.
+    Condition: A class for conditions on submission data that are evaluated over a GradeMatrix.
+    GradeMatrix: A class containing the submission data of a GradingBundle as students x assignments arrays.
+    GradingBundle: A class of StudentPortfolios plus additional data.
+    StudentPortfolio: A class of submissions from a single student plus additional data.
+"""
+
+import operator
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+from canvas_access.assignment import Assignment
+from canvas_access.course import Course
+from canvas_access.user import User
+from canvas_access.util import GET_list, list_to_dict
+
+class AssignmentCluster:
+    """
+    A collection of assignments that are grouped together for some reason, such as assignment groups or other types of related assignments.
+
+    Attributes:
+        assignment_ids (list[int]): A list of assignment_ids to be included in the cluster.
+        name (str): The name of the assignment cluster.
+        weight (float): The amount of weight of the cluster. This value is used with the weight_clusters() function.
+    """
+    def __init__(self, name: str, assignment_ids: list[int], weight: float = None):
+        self.name = name
+        self.assignment_ids = assignment_ids
+        self.weight = weight
+
+    def __str__(self):
+        return f'{self.name}\t{self.weight}\t{self.assignment_ids}'
+
+class Condition:
+    """
+    A condition on Submission attributes that is evaluated over the arrays of a GradeMatrix all at once. The
+    comparison is looked up once when the Condition is created. Conditions can be combined with & (AND), | (OR),
+    and ~ (NOT).
+
+    Example:
+        late_and_low = Condition('late', '==', True) & Condition('percent', '<', 50)
+        counts = late_and_low.count(bundle.matrix, cluster.assignment_ids)
+
+    Attributes:
+        comparison (function): The function used to compare the attribute with the comparison_value.
+        comparison_type (str): '==', '!=', '<', '<=', '>', or '>='. Invalid strings result in using '=='.
+        comparison_value (str|float): The string or value to compare against. Z-time strings and datetimes can be
+            used for submitted_at.
+        count_missing (bool): The result where the attribute (or the submission) is missing. An attribute whose value
+            is None is not missing: it only equals None (so '!=' is True and the other comparisons are False).
+        logic (str): 'and', 'or', or 'not' for combined conditions. None for a single comparison.
+        submission_attribute (str): The name of the attribute to be observed. 'percent' is the score as a percent of
+            the points possible.
+
+    Methods:
+        count(): Counts the submissions of each student that meet the condition
+        evaluate(): Evaluates the condition for some columns of a GradeMatrix
+        mask(): Creates a students x assignments mask of the submissions that meet the condition
+    """
+
+    comparisons = {
+        '==': operator.eq,
+        '!=': operator.ne,
+        '<': operator.lt,
+        '<=': operator.le,
+        '>': operator.gt,
+        '>=': operator.ge
+    }
+
+    def __init__(self, submission_attribute: str = None, comparison_type: str = '==', comparison_value: str|float = 0,
+                 count_missing: bool = True, logic: str = None, conditions: 'list[Condition]' = None):
+        self.comparison = self.comparisons.get(comparison_type, operator.eq)
+        self.comparison_type = comparison_type if comparison_type in self.comparisons else '=='
+        self.comparison_value = comparison_value
+        self.conditions = conditions if conditions != None else []
+        self.count_missing = count_missing
+        self.logic = logic
+        self.submission_attribute = submission_attribute
+
+    def __and__(self, other: 'Condition') -> 'Condition':
+        return Condition(logic = 'and', conditions = [self, other])
+
+    def __invert__(self) -> 'Condition':
+        return Condition(logic = 'not', conditions = [self])
+
+    def __or__(self, other: 'Condition') -> 'Condition':
+        return Condition(logic = 'or', conditions = [self, other])
+
+    def __str__(self):
+        if self.logic == 'not':
+            return f'~{self.conditions[0]}'
+        if self.logic != None:
+            symbol = ' & ' if self.logic == 'and' else ' | '
+            return '(' + symbol.join(str(condition) for condition in self.conditions) + ')'
+        return f'({self.submission_attribute} {self.comparison_type} {self.comparison_value!r})'
+
+    def count(self, matrix: 'GradeMatrix', assignment_ids: list[int] = None) -> np.ndarray:
+        """
+        Counts the submissions of each student that meet the condition.
+
+        Args:
+            matrix (GradeMatrix): The submission data.
+            assignment_ids (list[int]): The assignments to be counted. All of the assignments are counted if None.
+
+        Returns:
+            np.ndarray[int]: The count for each student (in the order of matrix.student_ids).
+        """
+        return self.mask(matrix, assignment_ids).sum(axis = 1)
+
+    def evaluate(self, matrix: 'GradeMatrix', columns: np.ndarray = None) -> np.ndarray:
+        """
+        Evaluates the condition for some columns of a GradeMatrix.
+
+        Args:
+            matrix (GradeMatrix): The submission data.
+            columns (np.ndarray[int]): The columns to evaluate. All of the columns are evaluated if None.
+
+        Returns:
+            np.ndarray[bool]: A students x columns mask.
+        """
+        if self.logic == 'not':
+            return ~self.conditions[0].evaluate(matrix, columns)
+        if self.logic == 'and':
+            return np.logical_and.reduce([condition.evaluate(matrix, columns) for condition in self.conditions])
+        if self.logic == 'or':
+            return np.logical_or.reduce([condition.evaluate(matrix, columns) for condition in self.conditions])
+
+        values, present = matrix.values(self.submission_attribute)
+        if columns is not None:
+            values = values[:, columns]
+            present = present[:, columns]
+
+        # Only the submissions that have the attribute are compared
+        mask = np.full(values.shape, self.count_missing, dtype = bool)
+        values = values[present]
+        if values.dtype.kind in 'fM' and self.comparison_value == None:
+            # None is stored as NaN/NaT
+            result = np.isnat(values) if values.dtype.kind == 'M' else np.isnan(values)
+            if self.comparison_type == '!=':
+                result = ~result
+            elif self.comparison_type not in ['==', '<=', '>=']:
+                result = np.zeros(values.shape, dtype = bool)
+        elif values.dtype.kind == 'M':
+            result = self.comparison(values, matrix.datetime64(self.comparison_value))
+        else:
+            result = self.comparison(values, self.comparison_value)
+        flag_none = matrix.flag_none.get(self.submission_attribute)
+        if flag_none is not None:
+            # A None flag is stored as False, so it is compared the way None is compared with any other value
+            if columns is not None:
+                flag_none = flag_none[:, columns]
+            if self.comparison_value == None:
+                result[flag_none[present]] = self.comparison_type == '=='
+            else:
+                result[flag_none[present]] = self.comparison_type == '!='
+        mask[present] = result
+        return mask
+
+    def mask(self, matrix: 'GradeMatrix', assignment_ids: list[int] = None) -> np.ndarray:
+        """
+        Creates a mask of the submissions that meet the condition.
+
+        Args:
+            matrix (GradeMatrix): The submission data.
+            assignment_ids (list[int]): The assignments to be included. All of the assignments are included if None.
+
+        Returns:
+            np.ndarray[bool]: A students x assignments mask (in the order of matrix.student_ids and assignment_ids).
+        """
+        return self.evaluate(matrix, None if assignment_ids == None else matrix.columns(assignment_ids))
+
+class GradeMatrix:
+    """
+    The submission data of a GradingBundle stored as dense students x assignments arrays. Rows follow the
+    student_ids and columns follow the assignment_ids of the bundle. It is built once with the GradingBundle so
+    that the cluster and weighting functions work on whole arrays instead of looping over every Submission.
+
+    Attributes:
+        assignment_ids (list[int]): The assignment_ids in column order.
+        assignment_index (dict[int]): The column of each assignment_id.
+        attribute_arrays (dict[tuple]): The (values, present) arrays of other Submission attributes, created the
+            first time they are used by values().
+        excused (np.ndarray[bool]): True where the submission is excused.
+        exists (np.ndarray[bool]): True where there is a submission.
+        flag_none (dict[np.ndarray[bool]]): For excused, late, and missing, True where the value is None. None is
+            stored as False in the flag array, so this keeps it apart for comparisons (see Condition.evaluate()).
+        late (np.ndarray[bool]): True where the submission is late.
+        missing (np.ndarray[bool]): True where the submission is missing.
+        percent (np.ndarray[float]): The score as a percent of the points possible (NaN if either is missing).
+        points_possible (np.ndarray[float]): The points possible for each assignment (NaN if there are none).
+        score (np.ndarray[float]): The score of each submission (NaN if there is no score).
+        student_ids (list[int]): The student_ids in row order.
+        student_index (dict[int]): The row of each student_id.
+        submissions (np.ndarray[Submission]): The Submission for each student and assignment (None if there is none,
+            or if the matrix was filled from a table).
+        submitted_at (np.ndarray[datetime64]): The UTC time of each submission (NaT if it was not submitted).
+        table (tuple): The submissions table (and the row and column of each of its rows) if the matrix was filled
+            from a table. None otherwise, and once a cell has been filled in again (see load_table()).
+
+    Methods:
+        cluster_scores(): Calculates the points and percentages for a cluster of assignments
+        columns(): Converts a list of assignment_ids into column numbers
+        compare(): Creates a mask of the submissions whose attribute meets a comparison
+        datetime64(): Converts a Z-time string or datetime into a np.datetime64
+        fill_from_table(): Fills in the arrays from a submissions table written by GradingBundle.to_parquet()
+        load_table(): Converts the rest of the columns of the submissions table and lets go of the table
+        set_cell(): Fills in the cell of a single submission
+        set_row(): Fills in the row of a student from their submissions
+        update_rows(): Fills in the rows of some students again after their submissions change
+        values(): Gets the array of any Submission attribute
+    """
+
+    # Submission attributes that are stored as typed arrays instead of being looked up by values()
+    typed_attributes = ('excused', 'late', 'missing', 'percent', 'score', 'submitted_at')
+
+    def __init__(self, bundle: 'GradingBundle', table: 'pyarrow.Table' = None): # type: ignore
+        self.assignment_ids = list(bundle.assignment_ids)
+        self.assignment_index = {assignment_id: column for column, assignment_id in enumerate(self.assignment_ids)}
+        self.attribute_arrays = {}
+        self.student_ids = list(bundle.student_ids)
+        self.student_index = {student_id: row for row, student_id in enumerate(self.student_ids)}
+
+        points_possible = [getattr(bundle.assignments[assignment_id], 'points_possible', None) for assignment_id in self.assignment_ids]
+        self.points_possible = np.array([np.nan if points == None else points for points in points_possible], dtype = float)
+
+        shape = (len(self.student_ids), len(self.assignment_ids))
+        self.excused = np.zeros(shape, dtype = bool)
+        self.exists = np.zeros(shape, dtype = bool)
+        self.flag_none = {name: np.zeros(shape, dtype = bool) for name in ['excused', 'late', 'missing']}
+        self.late = np.zeros(shape, dtype = bool)
+        self.missing = np.zeros(shape, dtype = bool)
+        self.percent = np.full(shape, np.nan)
+        self.score = np.full(shape, np.nan)
+        self.submissions = np.full(shape, None, dtype = object)
+        self.submitted_at = np.full(shape, np.datetime64('NaT'), dtype = 'datetime64[s]')
+        self.table = None
+
+        if table != None:
+            self.fill_from_table(table)
+            return
+        for row, student_id in enumerate(self.student_ids):
+            self.set_row(row, bundle.portfolios[student_id].submissions)
+
+    def __str__(self):
+        return f'GradeMatrix: {len(self.student_ids)} students x {len(self.assignment_ids)} assignments'
+
+    def cluster_scores(self, assignment_ids: list[int], rows: list[int] = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Calculates the points and percentages for a cluster of assignments. Missing scores count as 0 points.
+
+        Args:
+            assignment_ids (list[int]): The assignment_ids in the cluster.
+            rows (list[int]): The rows of the students to calculate. Every student is calculated if None.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The points and the percentages. The first value of each is for the points
+                possible, followed by one value for each student.
+        """
+        columns = self.columns(assignment_ids)
+        points_possible = np.nansum(self.points_possible[columns])
+        scores = self.score[:, columns] if rows == None else self.score[np.ix_(rows, columns)]
+        points = np.concatenate(([points_possible], np.nansum(scores, axis = 1)))
+        if points_possible == 0:
+            percents = np.zeros(len(points))
+        else:
+            percents = points / points_possible * 100
+        return points, percents
+
+    def columns(self, assignment_ids: list[int]) -> np.ndarray:
+        """
+        Converts a list of assignment_ids into column numbers.
+
+        Args:
+            assignment_ids (list[int]): The assignment_ids.
+
+        Returns:
+            np.ndarray[int]: The column of each assignment.
+        """
+        return np.array([self.assignment_index[assignment_id] for assignment_id in assignment_ids], dtype = int)
+
+    def compare(self, submission_attribute: str, comparison_type: str = '==', comparison_value: str|float = 0, count_missing: bool = True, columns: np.ndarray = None) -> np.ndarray:
+        """
+        Creates a mask of the submissions whose attribute meets a comparison with the comparison_value.
+
+        Args:
+            submission_attribute (str): The name of the attribute to be observed.
+            comparison_type (str): See Condition.
+            comparison_value (str|float): See Condition.
+            count_missing (bool): The value of the mask where the attribute (or the submission) is missing.
+            columns (np.ndarray[int]): The columns to compare. All of the columns are compared if None.
+
+        Returns:
+            np.ndarray[bool]: A students x columns mask.
+        """
+        return Condition(submission_attribute, comparison_type, comparison_value, count_missing).evaluate(self, columns)
+
+    def datetime64(self, value) -> np.datetime64:
+        """
+        Converts a Z-time string or datetime into a np.datetime64 (in UTC, without a timezone).
+
+        Args:
+            value (str|datetime): The time to convert.
+
+        Returns:
+            np.datetime64: The time.
+        """
+        if type(value) == str:
+            return np.datetime64(value.removesuffix('Z'), 's')
+        if getattr(value, 'tzinfo', None) != None:
+            from datetime import timezone
+            value = value.astimezone(timezone.utc).replace(tzinfo = None)
+        return np.datetime64(value, 's')
+
+    def fill_from_table(self, table: 'pyarrow.Table') -> None: # type: ignore
+        """
+        Fills in the arrays from a submissions table written by GradingBundle.to_parquet(), without creating any
+        Submissions. The other columns of the table are only converted when they are first used by values().
+
+        Args:
+            table (pyarrow.Table): The submissions table.
+
+        Returns:
+            None
+        """
+        rows = pd.Index(self.student_ids).get_indexer(table.column('student_id').to_numpy())
+        columns = pd.Index(self.assignment_ids).get_indexer(table.column('assignment_id').to_numpy())
+        self.exists[rows, columns] = True
+        self.score[rows, columns] = table.column('score').to_numpy()
+        for name in ['excused', 'late', 'missing']:
+            getattr(self, name)[rows, columns] = table.column(name).fill_null(False).to_numpy()
+            self.flag_none[name][rows, columns] = table.column(name).is_null().to_numpy(zero_copy_only = False)
+        self.submitted_at[rows, columns] = table.column('submitted_at').cast('timestamp[s]').to_numpy()
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            self.percent[:] = np.where(self.points_possible > 0, self.score / self.points_possible * 100, np.nan)
+        self.table = (table, rows, columns)
+
+    def load_table(self) -> None:
+        """
+        Converts every column of the submissions table that values() has not converted yet, and then lets go of the
+        table. This is done before a cell is filled in again (see set_cell()), so an attribute that is first used
+        after a refresh is not taken from the old values in the table.
+
+        Returns:
+            None
+        """
+        if self.table == None:
+            return
+        for submission_attribute in self.table[0].column_names:
+            if submission_attribute not in ['student_id', 'assignment_id']:
+                self.values(submission_attribute)
+        self.table = None
+
+    def set_cell(self, row: int, column: int, submission: 'Submission') -> None: # type: ignore
+        """
+        Fills in the cell of a single submission, including the arrays that values() already created. If the matrix
+        was filled from a table, the rest of the table is converted first (see load_table()).
+
+        Args:
+            row (int): The row of the student.
+            column (int): The column of the assignment.
+            submission (Submission): The submission, or None if there is no submission.
+
+        Returns:
+            None
+        """
+        if self.table != None:
+            self.load_table()
+        self.submissions[row, column] = submission
+        self.exists[row, column] = submission != None
+        score = getattr(submission, 'score', None)
+        self.score[row, column] = np.nan if score == None else score
+        if self.points_possible[column] > 0:
+            self.percent[row, column] = self.score[row, column] / self.points_possible[column] * 100
+        for name in ['excused', 'late', 'missing']:
+            value = getattr(submission, name, None)
+            getattr(self, name)[row, column] = value == True
+            self.flag_none[name][row, column] = submission != None and hasattr(submission, name) and value == None
+        submitted_at = getattr(submission, 'submitted_at', None)
+        self.submitted_at[row, column] = np.datetime64('NaT') if submitted_at == None else self.datetime64(submitted_at)
+
+        for submission_attribute, (values, present) in self.attribute_arrays.items():
+            present[row, column] = submission != None and hasattr(submission, submission_attribute)
+            if submission_attribute not in self.typed_attributes:
+                values[row, column] = getattr(submission, submission_attribute) if present[row, column] else None
+
+    def set_row(self, row: int, submissions: 'dict[Submission]') -> None: # type: ignore
+        """
+        Fills in the row of a student from their submissions.
+
+        Args:
+            row (int): The row of the student.
+            submissions (dict[Submission]): The submissions of the student indexed by assignment_id.
+
+        Returns:
+            None
+        """
+        for column, assignment_id in enumerate(self.assignment_ids):
+            self.set_cell(row, column, submissions.get(assignment_id))
+
+    def update_rows(self, bundle: 'GradingBundle', student_ids: list[int]) -> None:
+        """
+        Fills in the rows of some students again after their submissions change.
+
+        Args:
+            bundle (GradingBundle): The bundle containing the portfolios of the students.
+            student_ids (list[int]): The student_ids whose rows are filled in.
+
+        Returns:
+            None
+        """
+        for student_id in student_ids:
+            self.set_row(self.student_index[student_id], bundle.portfolios[student_id].submissions)
+
+    def values(self, submission_attribute: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Gets the array of any Submission attribute. Attributes that are not typed_attributes are looked up the
+        first time they are used and kept in attribute_arrays. If the matrix was filled from a table, they are
+        taken from the columns of the table instead (Z-times are converted back into Z-time strings).
+
+        Args:
+            submission_attribute (str): The name of the attribute.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The values, and a mask that is True where the submission has the attribute.
+        """
+        if submission_attribute == 'percent':
+            return self.percent, self.values('score')[1]
+        if submission_attribute == 'exists':
+            return self.exists, np.ones(self.exists.shape, dtype = bool)
+        if submission_attribute not in self.attribute_arrays and self.table != None:
+            table, rows, columns = self.table
+            if submission_attribute in table.column_names and submission_attribute not in self.typed_attributes:
+                import pyarrow as pa
+                import pyarrow.compute as pc
+                column = table.column(submission_attribute)
+                if pa.types.is_timestamp(column.type):
+                    column = pc.strftime(column, format = '%Y-%m-%dT%H:%M:%SZ')
+                values = np.full(self.exists.shape, None, dtype = object)
+                values[rows, columns] = column.to_pylist()
+                # A null value is treated as a missing attribute
+                present = np.zeros(self.exists.shape, dtype = bool)
+                present[rows, columns] = column.is_valid().to_numpy(zero_copy_only = False)
+                self.attribute_arrays[submission_attribute] = (values, present)
+            elif submission_attribute in self.typed_attributes:
+                self.attribute_arrays[submission_attribute] = (getattr(self, submission_attribute), self.exists.copy())
+        if submission_attribute not in self.attribute_arrays:
+            present = np.array([[submission != None and hasattr(submission, submission_attribute) for submission in row]
+                                for row in self.submissions], dtype = bool).reshape(self.submissions.shape)
+            if submission_attribute in self.typed_attributes:
+                values = getattr(self, submission_attribute)
+            else:
+                values = np.full(self.submissions.shape, None, dtype = object)
+                for row, column in zip(*np.nonzero(present)):
+                    values[row, column] = getattr(self.submissions[row, column], submission_attribute)
+            self.attribute_arrays[submission_attribute] = (values, present)
+        return self.attribute_arrays[submission_attribute]
+
+class GradingBundle:
+    """
+    A collection of StudentPortfolios plus additional data.
+
+    Attributes:
+        assignment_ids (list(int)): The list of assignment_ids.
+        assignment (dict(Assignment)): A dictionary of assignments for the course indexed by assignment_id.
+        course (Course): The course of the bundle.
+        last_sync (str): Z-time string of when the submissions were last loaded from the API.
+        matrix (GradeMatrix): The submission data of every portfolio as students x assignments arrays.
+        portfolios (dict(StudentPortfolio)): A dictionary of student portfolios indexed by student_id.
+        student_ids (list(int)): A list of student_ids.
+        students (dict[User]): A dictionary of students for the bundle indexed by student_id
+        type (str): Type of object for display in __str__.
+    
+    Methods:
+        from_parquet(): Opens a GradingBundle that was written by to_parquet()
+        refresh(): Loads only the submissions that changed since last_sync
+        to_parquet(): Writes the submissions, assignments, students, and clusters as Parquet tables
+    """
+
+    # Submission attributes (besides the typed arrays of the GradeMatrix) that are written by to_parquet()
+    parquet_attributes = {
+        'id': 'int64',
+        'attempt': 'int64',
+        'entered_grade': 'string',
+        'entered_score': 'float64',
+        'grade': 'string',
+        'graded_at': 'timestamp',
+        'late_policy_status': 'string',
+        'points_deducted': 'float64',
+        'seconds_late': 'int64',
+        'workflow_state': 'string'
+    }
+
+    def __init__(self, course: 'Course', assignments: 'dict[Assignment]', students: 'dict[User]'): # type: ignore
+        self.assignment_ids = list(assignments.keys())
+        self.assignments = assignments
+        self.course = course
+        self.portfolios = {}
+        self.student_ids = list(students.keys())
+        self.students = students
+        self.type = 'GradingBundle'
+
+        # The time is taken before the API calls so that changes made while loading are picked up by refresh()
+        self.last_sync = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        # Load the submission data for every student in one pass and sort it into portfolios
+        print(f'Getting submissions for {len(self.student_ids)} students')
+        student_submissions = {student_id: {} for student_id in self.student_ids}
+        for submission_id, submission in course.get_submissions(students).items():
+            if submission.user_id in student_submissions:
+                student_submissions[submission.user_id][submission_id] = submission
+        for student_id, student in students.items():
+            self.portfolios[student_id] = StudentPortfolio(course, student, assignments, student_submissions[student_id])
+        self.matrix = GradeMatrix(self)
+
+    @classmethod
+    def from_parquet(cls, path: str, course: 'Course' = None) -> 'tuple[GradingBundle, list[AssignmentCluster]]': # type: ignore
+        """
+        Opens a GradingBundle that was written by to_parquet(). The files are memory mapped and no API calls are
+        made. The GradeMatrix is filled directly from the submissions table, so no Submissions are created: the
+        portfolios have no submissions, matrix.submissions is empty, and the assignments, students, and course are
+        plain CanvasObjects with the stored columns. Everything that works on the GradeMatrix (such as
+        bundle_to_gradebook() and Condition) works the same as on the original bundle.
+
+        Requires the pyarrow package.
+
+        Args:
+            path (str): The directory that was written by to_parquet().
+            course (Course): Optional Course from the API. It is needed to refresh() the bundle.
+
+        Returns:
+            tuple[GradingBundle, list[AssignmentCluster]]: The bundle and the clusters that were written with it.
+        """
+        import json
+        import os
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+        from canvas_access.canvas_object import CanvasObject
+
+        tables = {}
+        for name in ['assignments', 'clusters', 'students', 'submissions']:
+            tables[name] = pq.read_table(os.path.join(path, f'{name}.parquet'), memory_map = True)
+        metadata = json.loads(tables['students'].schema.metadata[b'canvas_grade_bundle'])
+        if course == None:
+            course = CanvasObject({'id': metadata['course_id'], 'name': metadata['course_name']})
+
+        assignment_table = tables['assignments']
+        due_at = pc.strftime(assignment_table.column('due_at'), format = '%Y-%m-%dT%H:%M:%SZ')
+        assignment_table = assignment_table.set_column(assignment_table.column_names.index('due_at'), 'due_at', due_at)
+        assignments = {row['id']: CanvasObject(row) for row in assignment_table.to_pylist()}
+        students = {row['id']: CanvasObject(row) for row in tables['students'].to_pylist()}
+
+        bundle = cls.__new__(cls)
+        bundle.assignment_ids = list(assignments.keys())
+        bundle.assignments = assignments
+        bundle.course = course
+        bundle.last_sync = metadata['last_sync']
+        bundle.portfolios = {student_id: StudentPortfolio(course, student, {}, {}) for student_id, student in students.items()}
+        bundle.student_ids = list(students.keys())
+        bundle.students = students
+        bundle.type = 'GradingBundle'
+        bundle.matrix = GradeMatrix(bundle, tables['submissions'])
+
+        clusters = [AssignmentCluster(row['name'], row['assignment_ids'], row['weight']) for row in tables['clusters'].to_pylist()]
+        return bundle, clusters
+
+    def refresh(self) -> list[int]:
+        """
+        Loads only the submissions that were submitted or graded since last_sync, replaces them in the portfolios,
+        and fills in the matrix cells of the submissions that changed. New students and assignments are
+        not added; create a new GradingBundle for those.
+
+        Endpoint:
+            v1/courses/{course_id}/students/submissions (once with submitted_since and once with graded_since)
+
+        Returns:
+            list[int]: The student_ids whose submissions changed.
+        """
+        sync_time = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        print(f'Getting submissions changed since {self.last_sync}')
+        # Canvas combines the two filters with AND, so they are requested separately
+        submissions = self.course.get_submissions(self.students, submitted_since = self.last_sync)
+        submissions.update(self.course.get_submissions(self.students, graded_since = self.last_sync))
+
+        student_ids = {}
+        for submission in submissions.values():
+            if submission.user_id not in self.portfolios or submission.assignment_id not in self.assignments:
+                continue
+            submission.add_assignment_info(self.assignments[submission.assignment_id])
+            self.portfolios[submission.user_id].submissions[submission.assignment_id] = submission
+            self.matrix.set_cell(self.matrix.student_index[submission.user_id], self.matrix.assignment_index[submission.assignment_id], submission)
+            student_ids[submission.user_id] = True
+        self.last_sync = sync_time
+        return list(student_ids)
+
+    def to_parquet(self, path: str, clusters: list[AssignmentCluster] = []) -> None:
+        """
+        Writes the bundle as typed Parquet tables in a directory so that it can be opened again with from_parquet()
+        without using the API. The tables are submissions.parquet (one row for each submission), assignments.parquet,
+        students.parquet, and clusters.parquet. The course and last_sync are kept in the metadata of students.parquet.
+
+        Requires the pyarrow package.
+
+        Args:
+            path (str): The directory to write. It is created if needed.
+            clusters (list[AssignmentCluster]): Clusters to write with the bundle.
+
+        Returns:
+            None
+        """
+        import json
+        import os
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        def timestamps(values):
+            times = np.array([np.datetime64('NaT') if value == None else self.matrix.datetime64(value) for value in values], dtype = 'datetime64[s]')
+            return pa.array(times, from_pandas = True).cast(pa.timestamp('s', tz = 'UTC'))
+
+        matrix = self.matrix
+        rows, columns = np.nonzero(matrix.exists)
+        submissions = {
+            'student_id': pa.array(np.array(matrix.student_ids, dtype = np.int64)[rows]),
+            'assignment_id': pa.array(np.array(matrix.assignment_ids, dtype = np.int64)[columns]),
+            'score': pa.array(matrix.score[rows, columns], from_pandas = True),
+            'excused': pa.array(matrix.excused[rows, columns], mask = matrix.flag_none['excused'][rows, columns]),
+            'late': pa.array(matrix.late[rows, columns], mask = matrix.flag_none['late'][rows, columns]),
+            'missing': pa.array(matrix.missing[rows, columns], mask = matrix.flag_none['missing'][rows, columns]),
+            'submitted_at': pa.array(matrix.submitted_at[rows, columns], from_pandas = True).cast(pa.timestamp('s', tz = 'UTC'))
+        }
+        for name, type in self.parquet_attributes.items():
+            values = matrix.values(name)[0][rows, columns].tolist()
+            if type == 'timestamp':
+                submissions[name] = timestamps(values)
+                continue
+            try:
+                submissions[name] = pa.array(values, type = pa.type_for_alias(type))
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # Keep unexpected values as text instead of failing
+                submissions[name] = pa.array([None if value == None else str(value) for value in values], type = pa.string())
+
+        assignments = [self.assignments[assignment_id] for assignment_id in self.assignment_ids]
+        assignment_table = pa.table({
+            'id': pa.array(self.assignment_ids, type = pa.int64()),
+            'name': pa.array([getattr(assignment, 'name', None) for assignment in assignments], type = pa.string()),
+            'points_possible': pa.array(matrix.points_possible, from_pandas = True),
+            'assignment_group_id': pa.array([getattr(assignment, 'assignment_group_id', None) for assignment in assignments], type = pa.int64()),
+            'due_at': timestamps([getattr(assignment, 'due_at', None) for assignment in assignments])
+        })
+
+        students = [self.students[student_id] for student_id in self.student_ids]
+        metadata = {
+            'course_id': self.course.id,
+            'course_name': self.course.name,
+            'last_sync': self.last_sync
+        }
+        student_table = pa.table({
+            'id': pa.array(self.student_ids, type = pa.int64()),
+            'name': pa.array([getattr(student, 'name', None) for student in students], type = pa.string()),
+            'sis_user_id': pa.array([getattr(student, 'sis_user_id', None) for student in students], type = pa.string())
+        }).replace_schema_metadata({'canvas_grade_bundle': json.dumps(metadata)})
+
+        cluster_table = pa.table({
+            'name': pa.array([cluster.name for cluster in clusters], type = pa.string()),
+            'weight': pa.array([cluster.weight for cluster in clusters], type = pa.float64()),
+            'assignment_ids': pa.array([list(cluster.assignment_ids) for cluster in clusters], type = pa.list_(pa.int64()))
+        })
+
+        os.makedirs(path, exist_ok = True)
+        pq.write_table(pa.table(submissions), os.path.join(path, 'submissions.parquet'))
+        pq.write_table(assignment_table, os.path.join(path, 'assignments.parquet'))
+        pq.write_table(student_table, os.path.join(path, 'students.parquet'))
+        pq.write_table(cluster_table, os.path.join(path, 'clusters.parquet'))
+
+class StudentPortfolio:
+    """
+    Student portfolio of work and data. Submissions are pulled from the API unless they are provided, which
+    is how the GradingBundle passes in the submissions it already fetched for the whole course.
+
+    Attributes:
+        course_id (int): Course ID of the course.
+        id (int): User ID for the student.
+        submissions (dict[Submission]): A dictionary of submissions indexed by assignment_id.
+        type (str): Type of object for display in __str__.
+    
+    Methods:
+        None
+    """
+    def __init__(self, course: Course, user: User, assignments: dict[Assignment], submissions: 'dict[Submission]' = None): # type: ignore
+        self.course_id = course.id
+        self.course_name = course.name
+        self.student_id = user.id
+        self.student_name = user.name
+        self.student_NSHE = user.sis_user_id
+        self.type = 'StudentPortfolio'
+
+        if submissions == None:
+            submissions = user.get_submissions(course.id)
+        self.submissions = {
+            submission.assignment_id: submission for _, submission in submissions.items()
+        }
+        for assignment_id, assignment in assignments.items():
+            self.submissions[assignment_id].add_assignment_info(assignment)
+    
+    def __str__(self):
         print(f'{self.type} (Course: {self.course_name}): {self.student_id} \t{self.student_name} ({self.student_NSHE})')
\ No newline at end of file
@@ -1,247 +1,355 @@
-"""
-Grade_bundle functions for use with canvas_access.
-
-Functions:
-    bundle_to_df(): Converts a GradingBundle into a data frame.
-    score_by_cluster(): Calculates the total points and percentage earned for a cluster of assignments
-    weight_clusters(): Calculates the weighted score of a set of clusters
-"""
-
-import pandas as pd
-
-from canvas_access.assignment import Assignment
-from canvas_access.course import Course
-from canvas_access.user import User
-from canvas_access.util import GET_list, list_to_dict
-
-from canvas_grade_bundle.bundle_classes import AssignmentCluster, GradingBundle
-
-def bundle_to_grades(bundle: GradingBundle) -> pd.DataFrame:
-    """
-    Converts GradingBundle to data frame containing all the grades.
-    
-    Args:
-        bundle (GradingBundle): The grading bundle to be converted
-    
-    Returns:
-        pd.DataFrame: A dataframe whose rows are individual students and whose columns are identifying information and the scores for the assignments.
-    """
-    data = []
-
-    points_possible = {}
-    for assignment_id in bundle.assignment_ids:
-        assignment = bundle.assignments[assignment_id]
-        points_possible[f'{assignment.name} ({assignment.id})'] = assignment.points_possible
-    data.append(points_possible)
-
-    for student_id in bundle.student_ids:
-        portfolio = bundle.portfolios[student_id]
-        student_data = {}
-        for assignment_id in bundle.assignment_ids:
-            submission = portfolio.submissions[assignment_id]
-            student_data[f'{submission.assignment_name} ({assignment_id})'] = submission.score
-        data.append(student_data)
-    return pd.DataFrame(data).set_axis(['Points Possible'] + [student_id for student_id in bundle.student_ids], axis = 'index')
-
-def bundle_to_names(bundle: GradingBundle, columns: list[str] = ['Name', 'ID'], extra_rows: list[str] = ['Points Possible']) -> pd.DataFrame:
-    """
-    Converts GradingBundle to data frame containing identifying information and extra rows.
-    
-    Args:
-        bundle (GradingBundle): The grading bundle to be converted.
-        columns (list[str]): Identifying columns, default is name and ID.
-        extra_rows (list[str]): Creates extra rows at the top. The default is one row for the points possible.
-    
-    Returns:
-        pd.DataFrame: A dataframe whose rows are individual students with identifying information plus some number of additional rows on top.
-    """
-    data = {}
-    for column in columns:
-        if column == 'Name':
-            data['Name'] = ['' for _ in extra_rows] + [bundle.portfolios[student_id].student_name for student_id in bundle.student_ids]
-        elif column == 'ID':
-            data['ID'] = ['' for _ in extra_rows] + [student_id for student_id in bundle.student_ids]
-        else:
-            data[column] = ['' for _ in extra_rows] + [bundle.portfolios[student_id].__dict__[column] for student_id in bundle.student_ids]
-    return pd.DataFrame(data).set_axis(['Points Possible'] + [student_id for student_id in bundle.student_ids], axis = 'index')
-
-def count_in_cluster(name: str, bundle: GradingBundle, cluster: AssignmentCluster, submission_attribute: str, comparison_type: str = '==', comparison_value: str|float = 0, count_missing: bool = True) -> pd.Series:
-    """
-    Counts the number of assignments in the cluster of the given submission_attribute that meet the comparison with the threshold.
-    
-    Args:
-        name (str): Name of the data
-        bundle (GradingBundle): The grade bundle containing the course data.
-        cluster (AssignmentCluster): The assignment cluster to be counted.
-        submission_attribute (str): The name of the attribute to be observed.
-        comparison_type (str): The type of comparison to be made. Invalid strings result in using '=='.
-            '==': Count when it is equal to the comparison
-            '!=': Count when it is equal to the comparison
-            '<': Count when it is less than the comparison
-            '<=': Count when it is less than or equal to the comparison
-            '>': Count when it is greater than the comparison
-            '>=': Count when it is greater than or equal to the comparison
-        comparison_value (str|float): The string or value to comare against.
-        count_missing: Count if the attribute is missing.
-    
-    Returns:
-        pd.Series: A series that represents the count.
-    """
-
-    assignment_dict = get_by_condition(bundle, cluster, submission_attribute, comparison_type, comparison_value, count_missing)
-    count_list = []
-    for student_id in bundle.student_ids:
-        count_list.append(len(assignment_dict[student_id]))
-
-    final_count = pd.Series(count_list)
-    final_count.name = name
-    final_count.index = [student_id for student_id in bundle.student_ids]
-
-    return final_count
-
-def get_by_condition(bundle: GradingBundle, cluster: AssignmentCluster, submission_attribute: str, comparison_type: str = '==', comparison_value: str|float = 0, count_missing: bool = True) -> dict:
-    """
-    Creates a dictionary whose keys are student IDs and whose values are dicts of Submissions (indexed by assignment_id) that meet the condition.
-    
-    Args:
-        bundle (GradingBundle): The grade bundle containing the course data.
-        cluster (AssignmentCluster): The assignment cluster to be counted.
-        submission_attribute (str): The name of the attribute to be observed.
-        comparison_type (str): The type of comparison to be made. Invalid strings result in using '=='.
-            '==': Count when it is equal to the comparison
-            '!=': Count when it is equal to the comparison
-            '<': Count when it is less than the comparison
-            '<=': Count when it is less than or equal to the comparison
-            '>': Count when it is greater than the comparison
-            '>=': Count when it is greater than or equal to the comparison
-        comparison_value (str|float): The string or value to comare against.
-        count_missing: Count if the attribute is missing.
-    
-    Returns:
-        dict: The keys of the dict are student IDs and the value is the dict of Submissions that met the condition.
-    """
-    result_dict = {}
-    for student_id in bundle.student_ids:
-        portfolio = bundle.portfolios[student_id]
-        student_result = {}
-        for assignment_id in cluster.assignment_ids:
-            if submission_attribute in portfolio.submissions[assignment_id].__dict__.keys():
-                if comparison_type == '!=':
-                    if portfolio.submissions[assignment_id].__dict__[submission_attribute] != comparison_value:
-                        student_result[assignment_id] = portfolio.submissions[assignment_id]
-                elif comparison_type == '>':
-                    if portfolio.submissions[assignment_id].__dict__[submission_attribute] > comparison_value:
-                        student_result[assignment_id] = portfolio.submissions[assignment_id]
-                elif comparison_type == '<':
-                    if portfolio.submissions[assignment_id].__dict__[submission_attribute] < comparison_value:
-                        student_result[assignment_id] = portfolio.submissions[assignment_id]
-                elif comparison_type == '>=':
-                    if portfolio.submissions[assignment_id].__dict__[submission_attribute] >= comparison_value:
-                        student_result[assignment_id] = portfolio.submissions[assignment_id]
-                elif comparison_type == '<=':
-                    if portfolio.submissions[assignment_id].__dict__[submission_attribute] <= comparison_value:
-                        student_result[assignment_id] = portfolio.submissions[assignment_id]
-                else:
-                    if portfolio.submissions[assignment_id].__dict__[submission_attribute] == comparison_value:
-                        student_result[assignment_id] = portfolio.submissions[assignment_id]
-            else:
-                if count_missing:
-                    student_result[assignment_id] = portfolio.submissions[assignment_id]
-        result_dict[student_id] = student_result
-
-    return result_dict
-
-def make_gradebook(course: Course) -> pd.DataFrame:
-    """
-    Converts GradingBundle to data frame that is a gradebook with full grades and assignment groups.
-    
-    Args:
-        course (Course): The course from which to create the gradebook
-    
-    Returns:
-        pd.DataFrame: A dataframe that represents the gradebook
-    """
-    students = course.get_users()
-    assignments = course.get_assignments()
-    assignment_groups = course.get_assignment_groups()
-    bundle = GradingBundle(course, assignments, students)
-
-    clusters = []
-    for assignment_group_id, assignment_group in assignment_groups.items():
-        assignments = assignment_group.get_assignments()
-        assignment_ids = [assignment_id for assignment_id in assignments]
-        clusters.append(AssignmentCluster(assignment_group.name, assignment_ids, assignment_group.group_weight))
-
-    cluster_dfs = []
-    for cluster in clusters:
-        cluster_dfs.append(score_by_cluster(bundle, cluster))
-
-    final_grades = weight_clusters(bundle, clusters)
-
-    return pd.concat([bundle_to_names(bundle), bundle_to_grades_df(bundle)] + cluster_dfs + [final_grades], axis = 1)
-
-def score_by_cluster(bundle: GradingBundle, cluster: AssignmentCluster) -> pd.DataFrame:
-    """
-    Calculates points and percentages for each cluster.
-    
-    Args:
-        bundle (GradingBundle): The grading bundle to be converted
-    
-    Returns:
-        pd.DataFrame: A dataframe whose rows are individual students and whose columns are identifying information and the scores for the assignments.
-    """
-    # Count up possible points
-    points_possible = 0
-    for assignment_id in cluster.assignment_ids:
-        if 'points_possible' in bundle.assignments[assignment_id].__dict__.keys():
-            points_possible += bundle.assignments[assignment_id].points_possible
-
-    # Count up student scores
-    points_earned_list = []
-    for student_id in bundle.student_ids:
-        portfolio = bundle.portfolios[student_id]
-        points_earned = 0
-        for assignment_id in cluster.assignment_ids:
-            if 'score' in portfolio.submissions[assignment_id].__dict__.keys():
-                if portfolio.submissions[assignment_id].score != None:
-                    points_earned += portfolio.submissions[assignment_id].score
-        points_earned_list.append(points_earned)
-
-    if points_possible == 0:
-        percents = [0] + [0 for _ in points_earned_list]
-    else:
-        percents = [100] + [ points_earned/points_possible * 100 for points_earned in points_earned_list ]
-
-    data = {
-        f'{cluster.name} (Points)': [points_possible] + points_earned_list,
-        f'{cluster.name} (Percent)': percents,
-    }
-
-    return pd.DataFrame(data).set_axis(['Points Possible'] + [student_id for student_id in bundle.student_ids], axis = 'index')
-
-def weight_clusters(bundle: GradingBundle, clusters: list[AssignmentCluster]) -> pd.Series:
-    """
-    Calculates the weighted grade of a collection of clusters. If weights are not provided, it will calculate based on total points.
-    
-    Args:
-        bundle (GradingBundle): The grading bundle to be converted
-        clusters (list[AssignmentCluster]): The list of clusters to be calculated.
-    
-    Returns:
-        pd.Series: A series named 'Final Grade' that contains the grade as a percent.
-    """
-    total_weight = sum([cluster.weight for cluster in clusters if (cluster.weight != None and len(cluster.assignment_ids))])
-    cluster_scores = [ score_by_cluster(bundle, cluster) for cluster in clusters]
-    if total_weight > 0:
-        final_grade = sum([cluster.weight * df[f'{cluster.name} (Percent)'] for df, cluster in zip(cluster_scores, clusters)]) / total_weight
-    else:
-        total_points = sum([df[f'{cluster.name} (Points)'].get('Points Possible') for df, cluster in zip(cluster_scores, clusters) ])
-        points_earned = sum([df[f'{cluster.name} (Points)'] for df, cluster in zip(cluster_scores, clusters)])
-        if total_points == 0:
-            final_grade = pd.Series()
-        else:
-            final_grade = points_earned / total_points * 100
-    final_grade.name = 'Final Grade'
-    final_grade.index = ['Points Possible'] + [student_id for student_id in bundle.student_ids]
-
-    return final_grade
+"""
+Grade_bundle functions for use with canvas_access.
+
+Functions:
+    bundle_to_df(): Converts a GradingBundle into a data frame.
+    bundle_to_gradebook(): Converts a GradingBundle and a set of clusters into a gradebook
+    group_clusters(): Creates an AssignmentCluster for each assignment group
+    make_gradebook(): Creates the gradebook of a course
+    make_gradebooks(): Creates the gradebooks of several courses at the same time
+    refresh_gradebook(): Updates a gradebook with the submissions that changed since it was made
+    score_by_cluster(): Calculates the total points and percentage earned for a cluster of assignments
+    weight_clusters(): Calculates the weighted score of a set of clusters
+    weight_scores(): Calculates the weighted score from the points and percentages of a set of clusters
+"""
+
+import numpy as np
+import pandas as pd
+
+from canvas_access.assignment import Assignment
+from canvas_access.course import Course
+from canvas_access.user import User
+from canvas_access.util import GET_list, list_to_dict
+
+from canvas_grade_bundle.bundle_classes import AssignmentCluster, Condition, GradingBundle
+
+def bundle_to_grades(bundle: GradingBundle) -> pd.DataFrame:
+    """
+    Converts GradingBundle to data frame containing all the grades.
+    
+    Args:
+        bundle (GradingBundle): The grading bundle to be converted
+    
+    Returns:
+        pd.DataFrame: A dataframe whose rows are individual students and whose columns are identifying information and the scores for the assignments.
+    """
+    matrix = bundle.matrix
+    columns = [f'{bundle.assignments[assignment_id].name} ({assignment_id})' for assignment_id in matrix.assignment_ids]
+    data = np.vstack([matrix.points_possible, matrix.score])
+    return pd.DataFrame(data, columns = columns).set_axis(['Points Possible'] + [student_id for student_id in bundle.student_ids], axis = 'index')
+
+def bundle_to_gradebook(bundle: GradingBundle, clusters: list[AssignmentCluster]) -> pd.DataFrame:
+    """
+    Converts GradingBundle to data frame that is a gradebook with the names, grades, cluster scores, and final grade.
+    This has the same columns as combining bundle_to_names(), bundle_to_grades(), score_by_cluster() for each
+    cluster, and weight_clusters(), but all of the numeric columns are filled into one preallocated array instead
+    of making and concatenating a data frame for each part.
+    
+    Args:
+        bundle (GradingBundle): The grading bundle to be converted
+        clusters (list[AssignmentCluster]): The clusters to be scored and weighted.
+    
+    Returns:
+        pd.DataFrame: A dataframe that represents the gradebook
+    """
+    matrix = bundle.matrix
+    assignment_count = len(matrix.assignment_ids)
+    columns = [f'{bundle.assignments[assignment_id].name} ({assignment_id})' for assignment_id in matrix.assignment_ids]
+    for cluster in clusters:
+        columns += [f'{cluster.name} (Points)', f'{cluster.name} (Percent)']
+    columns.append('Final Grade')
+
+    # Row 0 is the points possible, followed by one row for each student
+    values = np.empty((len(matrix.student_ids) + 1, len(columns)))
+    values[0, :assignment_count] = matrix.points_possible
+    values[1:, :assignment_count] = matrix.score
+    cluster_scores = []
+    for index, cluster in enumerate(clusters):
+        points, percents = matrix.cluster_scores(cluster.assignment_ids)
+        values[:, assignment_count + 2 * index] = points
+        values[:, assignment_count + 2 * index + 1] = percents
+        cluster_scores.append((points, percents))
+    values[:, -1] = weight_scores(clusters, cluster_scores, len(matrix.student_ids))
+
+    index = ['Points Possible'] + [student_id for student_id in bundle.student_ids]
+    gradebook = pd.DataFrame(values, index = index, columns = columns, copy = False)
+    gradebook.insert(0, 'Name', [''] + [bundle.portfolios[student_id].student_name for student_id in bundle.student_ids])
+    gradebook.insert(1, 'ID', [''] + [student_id for student_id in bundle.student_ids])
+    return gradebook
+
+def bundle_to_names(bundle: GradingBundle, columns: list[str] = ['Name', 'ID'], extra_rows: list[str] = ['Points Possible']) -> pd.DataFrame:
+    """
+    Converts GradingBundle to data frame containing identifying information and extra rows.
+    
+    Args:
+        bundle (GradingBundle): The grading bundle to be converted.
+        columns (list[str]): Identifying columns, default is name and ID.
+        extra_rows (list[str]): Creates extra rows at the top. The default is one row for the points possible.
+    
+    Returns:
+        pd.DataFrame: A dataframe whose rows are individual students with identifying information plus some number of additional rows on top.
+    """
+    data = {}
+    for column in columns:
+        if column == 'Name':
+            data['Name'] = ['' for _ in extra_rows] + [bundle.portfolios[student_id].student_name for student_id in bundle.student_ids]
+        elif column == 'ID':
+            data['ID'] = ['' for _ in extra_rows] + [student_id for student_id in bundle.student_ids]
+        else:
+            data[column] = ['' for _ in extra_rows] + [bundle.portfolios[student_id].__dict__[column] for student_id in bundle.student_ids]
+    return pd.DataFrame(data).set_axis(['Points Possible'] + [student_id for student_id in bundle.student_ids], axis = 'index')
+
+def count_in_cluster(name: str, bundle: GradingBundle, cluster: AssignmentCluster, submission_attribute: str|Condition, comparison_type: str = '==', comparison_value: str|float = 0, count_missing: bool = True) -> pd.Series:
+    """
+    Counts the number of assignments in the cluster of the given submission_attribute that meet the comparison with the threshold.
+    
+    Args:
+        name (str): Name of the data
+        bundle (GradingBundle): The grade bundle containing the course data.
+        cluster (AssignmentCluster): The assignment cluster to be counted.
+        submission_attribute (str|Condition): The name of the attribute to be observed, or a Condition (which can
+            combine several comparisons with & and |). The remaining arguments are ignored for a Condition.
+        comparison_type (str): The type of comparison to be made. Invalid strings result in using '=='.
+            '==': Count when it is equal to the comparison
+            '!=': Count when it is equal to the comparison
+            '<': Count when it is less than the comparison
+            '<=': Count when it is less than or equal to the comparison
+            '>': Count when it is greater than the comparison
+            '>=': Count when it is greater than or equal to the comparison
+        comparison_value (str|float): The string or value to comare against.
+        count_missing: Count if the attribute is missing.
+    
+    Returns:
+        pd.Series: A series that represents the count.
+    """
+
+    condition = submission_attribute
+    if type(condition) != Condition:
+        condition = Condition(submission_attribute, comparison_type, comparison_value, count_missing)
+
+    final_count = pd.Series(condition.count(bundle.matrix, cluster.assignment_ids))
+    final_count.name = name
+    final_count.index = [student_id for student_id in bundle.student_ids]
+
+    return final_count
+
+def get_by_condition(bundle: GradingBundle, cluster: AssignmentCluster, submission_attribute: str|Condition, comparison_type: str = '==', comparison_value: str|float = 0, count_missing: bool = True) -> dict:
+    """
+    Creates a dictionary whose keys are student IDs and whose values are dicts of Submissions (indexed by assignment_id) that meet the condition.
+    
+    Args:
+        bundle (GradingBundle): The grade bundle containing the course data.
+        cluster (AssignmentCluster): The assignment cluster to be counted.
+        submission_attribute (str|Condition): The name of the attribute to be observed, or a Condition (which can
+            combine several comparisons with & and |). The remaining arguments are ignored for a Condition.
+        comparison_type (str): The type of comparison to be made. Invalid strings result in using '=='.
+            '==': Count when it is equal to the comparison
+            '!=': Count when it is equal to the comparison
+            '<': Count when it is less than the comparison
+            '<=': Count when it is less than or equal to the comparison
+            '>': Count when it is greater than the comparison
+            '>=': Count when it is greater than or equal to the comparison
+        comparison_value (str|float): The string or value to comare against.
+        count_missing: Count if the attribute is missing.
+    
+    Returns:
+        dict: The keys of the dict are student IDs and the value is the dict of Submissions that met the condition.
+    """
+    condition = submission_attribute
+    if type(condition) != Condition:
+        condition = Condition(submission_attribute, comparison_type, comparison_value, count_missing)
+    matrix = bundle.matrix
+    columns = matrix.columns(cluster.assignment_ids)
+    mask = condition.evaluate(matrix, columns)
+
+    result_dict = {}
+    for row, student_id in enumerate(matrix.student_ids):
+        result_dict[student_id] = {
+            cluster.assignment_ids[index]: matrix.submissions[row, columns[index]] for index in np.flatnonzero(mask[row])
+        }
+
+    return result_dict
+
+def group_clusters(assignment_groups: dict['AssignmentGroup']) -> list[AssignmentCluster]: # type: ignore
+    """
+    Creates an AssignmentCluster for each assignment group, weighted by the group weight. If the assignments were
+    included with the groups, no API calls are made.
+    
+    Args:
+        assignment_groups (dict[AssignmentGroup]): The assignment groups of the course, such as from
+            Course.get_assignment_groups(include_assignments = True)
+    
+    Returns:
+        list[AssignmentCluster]: One cluster for each assignment group
+    """
+    clusters = []
+    for assignment_group_id, assignment_group in assignment_groups.items():
+        if 'assignments' in assignment_group.__dict__.keys():
+            assignments = assignment_group.assignments
+        else:
+            assignments = assignment_group.get_assignments()
+        assignment_ids = [assignment_id for assignment_id in assignments]
+        clusters.append(AssignmentCluster(assignment_group.name, assignment_ids, assignment_group.group_weight))
+    return clusters
+
+def make_gradebook(course: Course) -> pd.DataFrame:
+    """
+    Converts GradingBundle to data frame that is a gradebook with full grades and assignment groups. The assignment
+    groups and their assignments are loaded in one paginated call, and the clusters are created from them.
+    
+    Args:
+        course (Course): The course from which to create the gradebook
+    
+    Returns:
+        pd.DataFrame: A dataframe that represents the gradebook
+    """
+    students = course.get_users()
+    assignment_groups = course.get_assignment_groups(include_assignments = True)
+    assignments = {}
+    for assignment_group in assignment_groups.values():
+        assignments.update(assignment_group.assignments)
+    bundle = GradingBundle(course, assignments, students)
+    clusters = group_clusters(assignment_groups)
+
+    return bundle_to_gradebook(bundle, clusters)
+
+def make_gradebooks(courses: dict[Course]|list[Course], workers: int = 4, combine: bool = False) -> tuple[dict[pd.DataFrame]|pd.DataFrame, dict[Exception]]:
+    """
+    Creates the gradebooks of several courses at the same time using a pool of threads. Courses from the same Canvas
+    share its session, so every thread is paced by the same RateLimiter. A course that fails does not stop the others.
+    
+    Args:
+        courses (dict[Course]|list[Course]): The courses from which to create the gradebooks, such as from Canvas.get_courses()
+        workers (int): The maximum number of courses worked on at the same time.
+        combine (bool): If True, the gradebooks are combined into one data frame whose index is (course_id, row).
+    
+    Returns:
+        tuple[dict[pd.DataFrame]|pd.DataFrame, dict[Exception]]: The gradebooks indexed by course_id (or the combined data frame),
+            and the exception raised for each course that failed indexed by course_id.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    import time
+
+    if type(courses) == dict:
+        courses = list(courses.values())
+    gradebooks = {}
+    failures = {}
+    start = time.perf_counter()
+    print(f'Making gradebooks for {len(courses)} courses with {workers} workers')
+    with ThreadPoolExecutor(max_workers = max(1, min(workers, len(courses)))) as executor:
+        futures = {executor.submit(make_gradebook, course): course for course in courses}
+        for count, future in enumerate(as_completed(futures), start = 1):
+            course = futures[future]
+            try:
+                gradebooks[course.id] = future.result()
+                print(f'[{count}/{len(courses)}] {course.name} ({course.id}): {len(gradebooks[course.id]) - 1} students \t{time.perf_counter() - start:.1f}s')
+            except Exception as exception:
+                failures[course.id] = exception
+                print(f'[{count}/{len(courses)}] {course.name} ({course.id}): FAILED {exception!r} \t{time.perf_counter() - start:.1f}s')
+    if len(failures):
+        print(f'{len(failures)} of {len(courses)} gradebooks failed: {list(failures.keys())}')
+
+    # Return the gradebooks in the same order as the courses
+    gradebooks = {course.id: gradebooks[course.id] for course in courses if course.id in gradebooks}
+    if combine:
+        if len(gradebooks) == 0:
+            return pd.DataFrame(), failures
+        return pd.concat(gradebooks, names = ['course_id', None]), failures
+    return gradebooks, failures
+
+def refresh_gradebook(gradebook: pd.DataFrame, bundle: GradingBundle, clusters: list[AssignmentCluster]) -> list[int]:
+    """
+    Updates a gradebook from bundle_to_gradebook() in place with the submissions that were submitted or graded since
+    the bundle was last synced (see GradingBundle.refresh()). Only the rows of the students whose submissions changed
+    are calculated again.
+
+    Example:
+        bundle = GradingBundle(course, course.get_assignments(), course.get_users())
+        clusters = group_clusters(course.get_assignment_groups())
+        gradebook = bundle_to_gradebook(bundle, clusters)
+        ...
+        refresh_gradebook(gradebook, bundle, clusters)
+    
+    Args:
+        gradebook (pd.DataFrame): The gradebook to be updated.
+        bundle (GradingBundle): The grading bundle used to make the gradebook.
+        clusters (list[AssignmentCluster]): The clusters used to make the gradebook.
+    
+    Returns:
+        list[int]: The student_ids whose rows were updated.
+    """
+    student_ids = bundle.refresh()
+    if len(student_ids) == 0:
+        return student_ids
+
+    matrix = bundle.matrix
+    rows = [matrix.student_index[student_id] for student_id in student_ids]
+    columns = [f'{bundle.assignments[assignment_id].name} ({assignment_id})' for assignment_id in matrix.assignment_ids]
+    gradebook.loc[student_ids, columns] = matrix.score[rows]
+
+    cluster_scores = [matrix.cluster_scores(cluster.assignment_ids, rows) for cluster in clusters]
+    for cluster, (points, percents) in zip(clusters, cluster_scores):
+        gradebook.loc[student_ids, f'{cluster.name} (Points)'] = points[1:]
+        gradebook.loc[student_ids, f'{cluster.name} (Percent)'] = percents[1:]
+    gradebook.loc[student_ids, 'Final Grade'] = weight_scores(clusters, cluster_scores, len(rows))[1:]
+
+    return student_ids
+
+def score_by_cluster(bundle: GradingBundle, cluster: AssignmentCluster) -> pd.DataFrame:
+    """
+    Calculates points and percentages for each cluster.
+    
+    Args:
+        bundle (GradingBundle): The grading bundle to be converted
+    
+    Returns:
+        pd.DataFrame: A dataframe whose rows are individual students and whose columns are identifying information and the scores for the assignments.
+    """
+    points, percents = bundle.matrix.cluster_scores(cluster.assignment_ids)
+
+    data = {
+        f'{cluster.name} (Points)': points,
+        f'{cluster.name} (Percent)': percents,
+    }
+
+    return pd.DataFrame(data).set_axis(['Points Possible'] + [student_id for student_id in bundle.student_ids], axis = 'index')
+
+def weight_clusters(bundle: GradingBundle, clusters: list[AssignmentCluster]) -> pd.Series:
+    """
+    Calculates the weighted grade of a collection of clusters. If weights are not provided, it will calculate based on total points.
+    
+    Args:
+        bundle (GradingBundle): The grading bundle to be converted
+        clusters (list[AssignmentCluster]): The list of clusters to be calculated.
+    
+    Returns:
+        pd.Series: A series named 'Final Grade' that contains the grade as a percent.
+    """
+    cluster_scores = [bundle.matrix.cluster_scores(cluster.assignment_ids) for cluster in clusters]
+    final_grade = pd.Series(weight_scores(clusters, cluster_scores, len(bundle.student_ids)), name = 'Final Grade')
+    final_grade.index = ['Points Possible'] + [student_id for student_id in bundle.student_ids]
+
+    return final_grade
+
+def weight_scores(clusters: list[AssignmentCluster], cluster_scores: list[tuple[np.ndarray, np.ndarray]], n_students: int) -> np.ndarray:
+    """
+    Calculates the weighted grade from the points and percentages of a collection of clusters. If weights are not provided, it will calculate based on total points.
+    
+    Args:
+        clusters (list[AssignmentCluster]): The list of clusters to be calculated.
+        cluster_scores (list[tuple[np.ndarray, np.ndarray]]): The points and percentages of each cluster from GradeMatrix.cluster_scores().
+        n_students (int): The number of students in cluster_scores (used when there are no clusters).
+    
+    Returns:
+        np.ndarray: The grade as a percent. The first value is for the points possible. All NaN if there are no clusters.
+    """
+    if not clusters:
+        return np.full(n_students + 1, np.nan)
+    total_weight = sum([cluster.weight for cluster in clusters if (cluster.weight != None and len(cluster.assignment_ids))])
+    if total_weight > 0:
+        weights = np.array([cluster.weight if cluster.weight != None else 0 for cluster in clusters], dtype = float)
+        return weights @ np.vstack([percents for _, percents in cluster_scores]) / total_weight
+    points = np.vstack([points for points, _ in cluster_scores]).sum(axis = 0)
+    if points[0] == 0:
+        return np.full(len(points), np.nan)
+    return points / points[0] * 100